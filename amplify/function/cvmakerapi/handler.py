@@ -5,17 +5,24 @@ import os
 import sys
 from pathlib import Path
 
-# Add the backend app to the Python path
+# Deployment packages ship the backend's `app` package next to this handler,
+# where Lambda's default path already finds it. Only fall back to the source
+# checkout when running from the repository.
 backend_path = Path(__file__).parent.parent.parent.parent.parent / "cv-app-ng-backend"
-sys.path.insert(0, str(backend_path))
+if backend_path.is_dir():
+    sys.path.insert(0, str(backend_path))
 
-from mangum import Mangum
-from app.main import app
-
-# Set environment variables for AWS Lambda
+# Set environment variables for AWS Lambda (before the app reads its settings)
 os.environ.setdefault("ENVIRONMENT", "production")
 os.environ.setdefault("DEBUG", "false")
 os.environ.setdefault("VERBOSE", "false")
 
+from mangum import Mangum
+from app.main import app
+from app.core.warmup import warm_up
+
 # Create the ASGI handler
 handler = Mangum(app, lifespan="off")
+
+# Run first-request work during init so snapshots/provisioned instances capture it
+warm_up()
@@ -3,11 +3,13 @@ Configuration management for the CV Builder application.
 Handles environment variables and application settings.
 """
 import os
-from typing import List
-from dotenv import load_dotenv
+from typing import FrozenSet, List, Tuple
 
-# Load environment variables
-load_dotenv()
+# Load environment variables from .env for local development. Lambda has no
+# .env file, so skip the import and filesystem lookup there.
+if not os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 class Settings:
     """Application settings and configuration."""
@@ -20,29 +22,55 @@ class Settings:
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     
     # CORS Configuration - Restrict to specific domains
-    CORS_ORIGINS: List[str] = [
+    CORS_ORIGINS: Tuple[str, ...] = (
         "http://localhost:5173",  # Development only
         "http://127.0.0.1:5173",  # Development only
         # Production domains will be added via environment variables
-    ]
+    )
     
     # Add production CORS origins from environment
-    PRODUCTION_CORS_ORIGINS: List[str] = os.getenv("CORS_ORIGINS", "").split(",") if os.getenv("CORS_ORIGINS") else []
+    PRODUCTION_CORS_ORIGINS: Tuple[str, ...] = tuple(
+        origin.strip() for origin in os.getenv("CORS_ORIGINS", "").split(",") if origin.strip()
+    )
     
     # Combine development and production origins
-    ALL_CORS_ORIGINS: List[str] = CORS_ORIGINS + [origin.strip() for origin in PRODUCTION_CORS_ORIGINS if origin.strip()]
+    ALL_CORS_ORIGINS: Tuple[str, ...] = CORS_ORIGINS + PRODUCTION_CORS_ORIGINS
     
     # OpenAI Configuration
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_BASE_URL: str = "https://api.openai.com/v1"
-    
-    # Pinecone Configuration
-    MOCK_PINECONE: bool = os.getenv("MOCK_PINECONE", "true").lower() == "true"
-    PINECONE_API_KEY: str = os.getenv("PINECONE_API_KEY", "")
-    PINECONE_INDEX_NAME: str = "cv-architect-index"
+    # The SDK retries rate-limited and transient failures with exponential backoff
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+    # Shared HTTP connection pool for the OpenAI client
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", "60"))
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    OPENAI_KEEPALIVE_EXPIRY: float = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
+    OPENAI_CONNECT_TIMEOUT: float = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+    # Multiplex concurrent calls over one connection (needs the h2 package)
+    OPENAI_HTTP2: bool = os.getenv("OPENAI_HTTP2", "true").lower() == "true"
+    # In-flight OpenAI calls per process, and seconds a call may wait for a
+    # slot before the request is rejected with 429
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_QUEUE_TIMEOUT: float = float(os.getenv("LLM_QUEUE_TIMEOUT", "5"))
+    # Token budgets for user text interpolated into prompts; longer input is
+    # truncated. Extraction runs on a 128k-context model and needs the whole CV
+    PROMPT_JOB_DESCRIPTION_MAX_TOKENS: int = int(os.getenv("PROMPT_JOB_DESCRIPTION_MAX_TOKENS", "1500"))
+    PROMPT_CV_MAX_TOKENS: int = int(os.getenv("PROMPT_CV_MAX_TOKENS", "3000"))
+    EXTRACTION_CV_MAX_TOKENS: int = int(os.getenv("EXTRACTION_CV_MAX_TOKENS", "12000"))
     
     # Template Configuration
     TEMPLATES_DIR: str = "./templates"
+    # Worker processes for WeasyPrint rendering; 0 renders in a thread instead
+    # (e.g. on Lambda, which lacks the shared memory process pools need)
+    PDF_RENDER_PROCESSES: int = int(os.getenv("PDF_RENDER_PROCESSES", str(os.cpu_count() or 1)))
+    # Rendered PDFs kept per identical HTML (re-downloads, retries); 0 disables
+    PDF_CACHE_MAX_ENTRIES: int = int(os.getenv("PDF_CACHE_MAX_ENTRIES", "32"))
+    # Compiled template bytecode shared by worker processes and restarts
+    JINJA_BYTECODE_CACHE: bool = os.getenv("JINJA_BYTECODE_CACHE", "true").lower() == "true"
+    # Empty uses Jinja's per-user temp directory; a custom directory must be
+    # owned by this user and not group- or world-writable
+    JINJA_BYTECODE_CACHE_DIR: str = os.getenv("JINJA_BYTECODE_CACHE_DIR", "")
     
     # AWS Configuration
     AWS_REGION: str = os.getenv("AWS_DEFAULT_REGION", "us-east-1")
@@ -50,20 +78,50 @@ class Settings:
     
     # Lambda Configuration
     IS_LAMBDA: bool = os.getenv("AWS_LAMBDA_FUNCTION_NAME") is not None
+    # Build AI/vectorstore services during init (for SnapStart/provisioned concurrency)
+    PREWARM_SERVICES: bool = os.getenv("PREWARM_SERVICES", "false").lower() == "true"
     
     # File Upload Configuration
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
-    ALLOWED_FILE_TYPES: List[str] = [
+    ALLOWED_FILE_TYPES: FrozenSet[str] = frozenset({
         "application/pdf",
         "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-    ]
+    })
+    MAX_IMAGE_SIZE: int = 5 * 1024 * 1024  # 5MB (decoded)
+    ALLOWED_IMAGE_TYPES: FrozenSet[str] = frozenset({
+        "image/jpeg", "image/png", "image/webp", "image/gif"
+    })
     
-    # Evaluation Configuration
-    EVALUATION_PERSONAS: List[str] = [
+    # Evaluation Configuration (ordered: results are reported in this order)
+    EVALUATION_PERSONAS: Tuple[str, ...] = (
         "Strict Hiring Manager",
         "Creative Recruiter", 
         "Senior Technical Lead"
-    ]
+    )
+    # Personas score a short summary instead of the full CV once the CV JSON
+    # exceeds this many characters (~1500 tokens); 0 disables summarizing
+    COMMITTEE_SUMMARY_MIN_CHARS: int = int(os.getenv("COMMITTEE_SUMMARY_MIN_CHARS", "6000"))
+    # Threads reserved for RAGAS runs, so they cannot starve the default
+    # executor that file parsing and retrieval share
+    RAGAS_MAX_WORKERS: int = int(os.getenv("RAGAS_MAX_WORKERS", "2"))
+    
+    # LLM Response Cache Configuration
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+    # Seconds a cached response stays valid; 0 keeps entries until LRU eviction
+    LLM_CACHE_TTL_SECONDS: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(6 * 3600)))
+    # Semantic matching reuses responses for near-duplicate inputs; off by default
+    LLM_CACHE_SEMANTIC: bool = os.getenv("LLM_CACHE_SEMANTIC", "false").lower() == "true"
+    LLM_CACHE_SIMILARITY_THRESHOLD: float = float(os.getenv("LLM_CACHE_SIMILARITY_THRESHOLD", "0.92"))
+    # Whole-response cache for /cv/tailor. Exact matches only by default: a
+    # near-duplicate job description could otherwise reuse a CV tailored to
+    # a different job. Semantic matches, when enabled, are scoped to the same CV
+    TAILOR_CACHE_SEMANTIC: bool = os.getenv("TAILOR_CACHE_SEMANTIC", "false").lower() == "true"
+    TAILOR_CACHE_SIMILARITY_THRESHOLD: float = float(os.getenv("TAILOR_CACHE_SIMILARITY_THRESHOLD", "0.95"))
+    
+    # Embedding Cache Configuration (~3KB per cached ada-002 vector as float16)
+    EMBEDDING_CACHE_MAX_ENTRIES: int = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "2048"))
+    # "float16" halves cache memory at negligible cosine-similarity error; "float32" stores exact values
+    EMBEDDING_CACHE_DTYPE: str = os.getenv("EMBEDDING_CACHE_DTYPE", "float16")
     
     # RAG Configuration
     CHUNK_SIZE: int = 1000
@@ -0,0 +1,141 @@
+"""
+Lightweight pure-ASGI CORS middleware.
+
+Starlette's CORSMiddleware builds Headers/Response objects on every request.
+This implementation works directly on the raw ASGI header list and only
+touches requests that carry an ``Origin`` header.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+ALL_METHODS = ("DELETE", "GET", "HEAD", "OPTIONS", "PATCH", "POST", "PUT")
+# CORS-safelisted request headers, always allowed in preflights (as in Starlette)
+SAFELISTED_HEADERS = frozenset(("accept", "accept-language", "content-language", "content-type"))
+
+class CORSMiddleware:
+    """Pure-ASGI CORS middleware with precomputed header bytes."""
+
+    def __init__(
+        self,
+        app,
+        allow_origins: Iterable[str] = (),
+        allow_methods: Iterable[str] = ("GET",),
+        allow_headers: Iterable[str] = (),
+        allow_credentials: bool = False,
+        max_age: int = 600,
+    ):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+            allow_origins: Origins allowed to make cross-origin requests ("*" for any)
+            allow_methods: Methods allowed in preflight requests ("*" for any)
+            allow_headers: Request headers allowed in preflight requests ("*" for any)
+            allow_credentials: Whether to allow cookies/authorization headers
+            max_age: Seconds browsers may cache preflight responses
+        """
+        self.app = app
+        self.origins = frozenset(allow_origins)
+        self.allow_all_origins = "*" in self.origins
+        self.allow_all_headers = "*" in allow_headers
+        self.allow_credentials = allow_credentials
+
+        methods = ALL_METHODS if "*" in allow_methods else tuple(allow_methods)
+        self.allowed_methods = frozenset(method.encode("latin-1") for method in methods)
+        self.allowed_headers = SAFELISTED_HEADERS | {header.lower() for header in allow_headers}
+        simple_headers: List[Tuple[bytes, bytes]] = []
+        if allow_credentials:
+            simple_headers.append((b"access-control-allow-credentials", b"true"))
+        self.simple_headers = simple_headers
+
+        preflight_headers = list(simple_headers)
+        preflight_headers.append((b"access-control-allow-methods", ", ".join(methods).encode("latin-1")))
+        preflight_headers.append((b"access-control-max-age", str(max_age).encode("latin-1")))
+        if not self.allow_all_headers and allow_headers:
+            preflight_headers.append((b"access-control-allow-headers", ", ".join(allow_headers).encode("latin-1")))
+        self.preflight_headers = preflight_headers
+
+    def _allow_origin_value(self, origin: bytes) -> Optional[bytes]:
+        """Return the Access-Control-Allow-Origin value for an origin, or None if disallowed."""
+        if self.allow_all_origins:
+            # Credentialed requests must echo the concrete origin
+            return origin if self.allow_credentials else b"*"
+        if origin.decode("latin-1") in self.origins:
+            return origin
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        request_method = None
+        request_headers = None
+        for key, value in scope["headers"]:
+            if key == b"origin":
+                origin = value
+            elif key == b"access-control-request-method":
+                request_method = value
+            elif key == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        allow_origin = self._allow_origin_value(origin)
+
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            await self._preflight(allow_origin, request_method, request_headers, send)
+            return
+
+        if allow_origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        cors_headers = [(b"access-control-allow-origin", allow_origin), (b"vary", b"Origin")]
+        cors_headers.extend(self.simple_headers)
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + cors_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    async def _preflight(self, allow_origin: Optional[bytes], request_method: bytes,
+                         request_headers: Optional[bytes], send) -> None:
+        """Answer a CORS preflight request without invoking the application."""
+        failures = []
+        if allow_origin is None:
+            failures.append("origin")
+        if request_method not in self.allowed_methods:
+            failures.append("method")
+        if request_headers is not None and not self.allow_all_headers:
+            requested = (header.strip().lower() for header in request_headers.decode("latin-1").split(","))
+            if any(header and header not in self.allowed_headers for header in requested):
+                failures.append("headers")
+
+        if failures:
+            body = ("Disallowed CORS " + ", ".join(failures)).encode("latin-1")
+            await send({
+                "type": "http.response.start",
+                "status": 400,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        headers = [(b"access-control-allow-origin", allow_origin), (b"vary", b"Origin")]
+        headers.extend(self.preflight_headers)
+        if self.allow_all_headers and request_headers is not None:
+            headers.append((b"access-control-allow-headers", request_headers))
+        headers.append((b"content-length", b"2"))
+        headers.append((b"content-type", b"text/plain; charset=utf-8"))
+
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b"OK"})
@@ -0,0 +1,67 @@
+"""
+Cold-start warm-up for Lambda deployments.
+
+Lambda SnapStart and provisioned concurrency snapshot everything done at
+module import, so running first-request work here moves it off the
+request path.
+"""
+import orjson
+from .config import settings
+from ..utils.debug import print_step
+
+def warm_up() -> None:
+    """
+    Exercise first-request code paths during initialization.
+
+    Always warms the cheap paths (model validation/serialization, date
+    parsing, JSON encoding). Builds the AI, vectorstore, evaluation and PDF
+    services and imports RAGAS only when PREWARM_SERVICES is enabled, since
+    doing so costs time on every ordinary cold start.
+    """
+    from ..models.cv_models import CVData, parse_date_string
+
+    print_step("Warm-up", {"prewarm_services": settings.PREWARM_SERVICES}, "input")
+
+    cv_data = CVData.model_validate({
+        "personal": {"name": "Warm Up"},
+        "experience": [{
+            "company": "", "role": "", "startDate": "Jan 2023", "endDate": "Present",
+            "location": "", "description": "", "startDateValue": parse_date_string("Jan 2023"),
+        }],
+        "skills": {},
+    })
+    orjson.dumps(cv_data.model_dump())
+
+    if settings.PREWARM_SERVICES:
+        from ..services.deps import (
+            get_ai_service, get_data_transformation_service,
+            get_evaluation_service, get_pdf_service, get_vectorstore_service
+        )
+        from ..services.evaluation_service import _load_ragas
+        get_ai_service()
+        get_vectorstore_service()
+        get_evaluation_service()
+        get_data_transformation_service()
+        get_pdf_service()
+        _load_ragas()
+        _warm_pdf_renderer()
+
+    print_step("Warm-up", "Warm-up complete", "output")
+
+def _warm_pdf_renderer() -> None:
+    """
+    Load WeasyPrint and the system fonts in the process that will render PDFs.
+
+    Pool workers warm themselves when they start, so this only renders
+    here when PDFs fall back to threads (e.g. on Lambda, which has no
+    /dev/shm for process pools). A failure is logged rather than raised
+    so it cannot stop the handler from initializing.
+    """
+    from ..services.pdf_service import _pdf_pool, _warm_renderer
+
+    if _pdf_pool() is not None:
+        return
+    try:
+        _warm_renderer()
+    except Exception as e:
+        print_step("Warm-up", f"PDF renderer warm-up failed: {e}", "error")
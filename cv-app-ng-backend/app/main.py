@@ -1,10 +1,13 @@
 """
 Main FastAPI application entry point.
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from .core.cors import CORSMiddleware
 from .core.config import settings
 from .routes import cv_router, pdf_router, evaluation_router, utility_router
+from .services.deps import close_services
 from .utils.debug import print_step
 
 def create_app() -> FastAPI:
@@ -18,7 +21,11 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.API_TITLE,
         version=settings.API_VERSION,
-        debug=settings.DEBUG
+        debug=settings.DEBUG,
+        default_response_class=ORJSONResponse,
+        # The banner is only useful for local development; skip its stdout I/O
+        # on Lambda cold starts (Mangum runs with lifespan="off" there anyway)
+        lifespan=None if settings.IS_LAMBDA else _startup_lifespan
     )
     
     # Add CORS middleware
@@ -45,23 +52,31 @@ def create_app() -> FastAPI:
     
     return app
 
+def _print_startup_banner() -> None:
+    """Print the endpoint overview banner when serving locally."""
+    print_step("Application Startup", "CV Generator API is ready to serve requests!", "output")
+    print("\n" + "="*80)
+    print("🚀 CV GENERATOR API STARTED SUCCESSFULLY")
+    print("="*80)
+    print("📋 Available Endpoints:")
+    print("   • GET  /                    - Health check")
+    print("   • POST /cv/tailor           - Tailor CV from text")
+    print("   • POST /cv/tailor-from-file - Tailor CV from uploaded file")
+    print("   • POST /evaluation/cv       - Perform committee evaluation on a generated CV")
+    print("   • POST /pdf/generate        - Generate PDF from CV data using templates")
+    print("   • GET  /pdf/templates       - Get available PDF templates")
+    print("   • POST /utility/transcribe-audio - Transcribe audio to text")
+    print("   • POST /utility/analyze-jd-image - Extract job description from image")
+    print("="*80)
+    print("🔧 Debug Mode: ENABLED - Detailed logging will be shown for each request")
+    print("="*80 + "\n")
+
+@asynccontextmanager
+async def _startup_lifespan(app: FastAPI):
+    """Print the startup banner once the server is up; close shared clients on shutdown."""
+    _print_startup_banner()
+    yield
+    await close_services()
+
 # Create the app instance
 app = create_app()
-
-# Application startup message
-print_step("Application Startup", "CV Generator API is ready to serve requests!", "output")
-print("\n" + "="*80)
-print("🚀 CV GENERATOR API STARTED SUCCESSFULLY")
-print("="*80)
-print("📋 Available Endpoints:")
-print("   • GET  /                    - Health check")
-print("   • POST /cv/tailor           - Tailor CV from text")
-print("   • POST /cv/tailor-from-file - Tailor CV from uploaded file")
-print("   • POST /evaluation/cv       - Perform committee evaluation on a generated CV")
-print("   • POST /pdf/generate        - Generate PDF from CV data using templates")
-print("   • GET  /pdf/templates       - Get available PDF templates")
-print("   • POST /utility/transcribe-audio - Transcribe audio to text")
-print("   • POST /utility/analyze-jd-image - Extract job description from image")
-print("="*80)
-print("🔧 Debug Mode: ENABLED - Detailed logging will be shown for each request")
-print("="*80 + "\n")
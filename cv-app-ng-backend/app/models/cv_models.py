@@ -1,18 +1,27 @@
 """
 CV-specific Pydantic models for templating system.
 """
-from pydantic import BaseModel
+import re
+from datetime import datetime
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict
 from typing import List, Dict, Any, Optional
 
-class DateValue(BaseModel):
+class CVBaseModel(BaseModel):
+    """Base model sharing one validation config across all CV models."""
+    model_config = ConfigDict(extra='ignore', populate_by_name=True)
+
+class DateValue(CVBaseModel):
     """Enhanced date value model for better date handling."""
+    model_config = ConfigDict(frozen=True)
     year: int
     month: Optional[int] = None  # 1-12, optional for year-only dates
     day: Optional[int] = None    # 1-31, optional for month/year or year-only dates
     isPresent: Optional[bool] = None  # true for "Present" or "Current" dates
 
-class PersonalInfo(BaseModel):
+class PersonalInfo(CVBaseModel):
     """Personal information model."""
+    model_config = ConfigDict(frozen=True)
     name: str = "Your Name"
     email: str = "your.email@example.com"
     phone: str = "+1234567890"
@@ -21,7 +30,7 @@ class PersonalInfo(BaseModel):
     linkedin: str = "linkedin.com/in/username"
     github: str = "github.com/username"
 
-class Experience(BaseModel):
+class Experience(CVBaseModel):
     """Professional experience model."""
     company: str
     role: str
@@ -34,7 +43,7 @@ class Experience(BaseModel):
     startDateValue: Optional[DateValue] = None
     endDateValue: Optional[DateValue] = None
 
-class Education(BaseModel):
+class Education(CVBaseModel):
     """Education model."""
     institution: str
     degree: str
@@ -46,7 +55,7 @@ class Education(BaseModel):
     startDateValue: Optional[DateValue] = None
     endDateValue: Optional[DateValue] = None
 
-class Project(BaseModel):
+class Project(CVBaseModel):
     """Project model."""
     name: str
     description: str
@@ -58,14 +67,16 @@ class Project(BaseModel):
     startDateValue: Optional[DateValue] = None
     endDateValue: Optional[DateValue] = None
 
-class Skills(BaseModel):
+class Skills(CVBaseModel):
     """Skills model."""
+    model_config = ConfigDict(frozen=True)
     technical: List[str] = []
     soft: List[str] = []
     languages: List[str] = []
 
-class LicenseCertification(BaseModel):
+class LicenseCertification(CVBaseModel):
     """License and certification model."""
+    model_config = ConfigDict(frozen=True)
     name: str
     issuer: str
     date: str
@@ -74,7 +85,7 @@ class LicenseCertification(BaseModel):
     dateValue: Optional[DateValue] = None
     expiryValue: Optional[DateValue] = None
 
-class CVData(BaseModel):
+class CVData(CVBaseModel):
     """Complete CV data model."""
     personal: PersonalInfo
     professional_summary: str = ""
@@ -84,52 +95,80 @@ class CVData(BaseModel):
     skills: Skills
     licenses_certifications: List[LicenseCertification] = []
 
-class PDFRequest(BaseModel):
+class PDFRequest(CVBaseModel):
     """PDF generation request model."""
     templateId: str
     data: CVData
 
+# Date utility constants, built once at import time
+_MONTH_NAMES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+# Lower, Title and UPPER spellings so common inputs hit without a .lower() call
+_MONTH_INDEX = {
+    variant: i
+    for i, name in enumerate(_MONTH_NAMES, start=1)
+    for variant in (name.lower(), name, name.upper())
+}
+
+_PRESENT_DATES = frozenset(('present', 'current'))
+# No date in a supported format comes near this length (the longest, "15 Jan 2023", is 11)
+_MAX_DATE_LENGTH = 40
+
+_DATE_PATTERNS = (
+    # Year only or Month Year ("2023", "Jan 2023"), the formats the extraction prompt asks for
+    (re.compile(r'^(?:(\w{3})\s+)?(\d{4})$'), lambda m: DateValue(
+        year=int(m.group(2)),
+        month=_month_name_to_number(m.group(1)) if m.group(1) else None
+    )),
+    (re.compile(r'^(\d{1,2})\s+(\w{3})\s+(\d{4})$'), lambda m: DateValue(year=int(m.group(3)), month=_month_name_to_number(m.group(2)), day=int(m.group(1)))),  # Day Month Year: "15 Jan 2023"
+    (re.compile(r'^(\d{1,2})/(\d{1,2})/(\d{4})$'), lambda m: DateValue(year=int(m.group(3)), month=int(m.group(1)), day=int(m.group(2)))),  # MM/DD/YYYY
+    (re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$'), lambda m: DateValue(year=int(m.group(1)), month=int(m.group(2)), day=int(m.group(3)))),  # YYYY-MM-DD
+)
+
 # Date utility functions
 def format_date(date_value: DateValue) -> str:
     """Format a DateValue object into a human-readable string."""
     if date_value.isPresent:
         return "Present"
     
-    if date_value.day and date_value.month:
-        # Full date: "Jan 2023" or "15 Jan 2023"
-        month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                      'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        month = month_names[date_value.month - 1]
-        return f"{date_value.day} {month} {date_value.year}"
-    elif date_value.month:
-        # Month/Year: "Jan 2023"
-        month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                      'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        month = month_names[date_value.month - 1]
-        return f"{month} {date_value.year}"
-    else:
+    month = date_value.month
+    if not month:
         # Year only: "2023"
         return str(date_value.year)
+    
+    # Month/Year: "Jan 2023", or full date: "15 Jan 2023"
+    day_prefix = f"{date_value.day} " if date_value.day else ""
+    return f"{day_prefix}{_MONTH_NAMES[month - 1]} {date_value.year}"
 
 def parse_date_string(date_string: str) -> Optional[DateValue]:
     """Parse a date string into a DateValue object."""
-    import re
-    from datetime import datetime
-    
-    if not date_string or date_string.lower() in ['present', 'current']:
-        return DateValue(year=datetime.now().year, isPresent=True)
-    
-    # Try to parse various date formats
-    patterns = [
-        (r'^(\d{4})$', lambda m: DateValue(year=int(m.group(1)))),  # Year only: "2023"
-        (r'^(\w{3})\s+(\d{4})$', lambda m: DateValue(year=int(m.group(2)), month=_month_name_to_number(m.group(1)))),  # Month Year: "Jan 2023"
-        (r'^(\d{1,2})\s+(\w{3})\s+(\d{4})$', lambda m: DateValue(year=int(m.group(3)), month=_month_name_to_number(m.group(2)), day=int(m.group(1)))),  # Day Month Year: "15 Jan 2023"
-        (r'^(\d{1,2})/(\d{1,2})/(\d{4})$', lambda m: DateValue(year=int(m.group(3)), month=int(m.group(1)), day=int(m.group(2)))),  # MM/DD/YYYY
-        (r'^(\d{4})-(\d{1,2})-(\d{1,2})$', lambda m: DateValue(year=int(m.group(1)), month=int(m.group(2)), day=int(m.group(3)))),  # YYYY-MM-DD
-    ]
-    
-    for pattern, parser in patterns:
-        match = re.match(pattern, date_string)
+    if not date_string or date_string.lower() in _PRESENT_DATES:
+        return _present_date(datetime.now().year)
+    if len(date_string) > _MAX_DATE_LENGTH:
+        # Free text in a date field; skip the patterns and keep it out of the cache
+        return None
+    return _parse_dated_string(date_string)
+
+@lru_cache(maxsize=1)
+def _present_date(year: int) -> DateValue:
+    """
+    Return the "Present" DateValue for a year.
+
+    Keyed by year so it rolls over at New Year in long-running processes;
+    reusing the frozen instance skips model validation on every "Present".
+    """
+    return DateValue(year=year, isPresent=True)
+
+@lru_cache(maxsize=4096)
+def _parse_dated_string(date_string: str) -> Optional[DateValue]:
+    """
+    Match a (non-"Present") date string against the known formats.
+
+    Memoized: CVs repeat the same few dates, and DateValue is frozen so
+    cached instances can be shared.
+    """
+    for pattern, parser in _DATE_PATTERNS:
+        match = pattern.match(date_string)
         if match:
             try:
                 return parser(match)
@@ -140,12 +179,11 @@ def parse_date_string(date_string: str) -> Optional[DateValue]:
 
 def _month_name_to_number(month_name: str) -> Optional[int]:
     """Convert month name to number (1-12)."""
-    month_names = ['jan', 'feb', 'mar', 'apr', 'may', 'jun',
-                   'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
-    try:
-        return month_names.index(month_name.lower()) + 1
-    except ValueError:
-        return None
+    month = _MONTH_INDEX.get(month_name)
+    if month is None:
+        # Mixed-case spellings such as "jAN"
+        month = _MONTH_INDEX.get(month_name.lower())
+    return month
 
 def create_date_value(year: int, month: Optional[int] = None, day: Optional[int] = None, is_present: Optional[bool] = None) -> DateValue:
     """Create a DateValue object."""
@@ -1,8 +1,10 @@
 """
 Request models for API endpoints.
 """
+from functools import cached_property
+from typing import Dict, Any, List
+import orjson
 from pydantic import BaseModel
-from typing import Dict, Any
 
 class CVRequest(BaseModel):
     """CV tailoring request model."""
@@ -18,6 +20,11 @@ class EvaluationRequest(BaseModel):
     job_description: str
     cv_json: Dict[str, Any]
 
+    @cached_property
+    def cv_json_str(self) -> str:
+        """Compact JSON of cv_json for LLM prompts (indentation only costs tokens)."""
+        return orjson.dumps(self.cv_json).decode()
+
 class ExtractCVRequest(BaseModel):
     """CV extraction request model."""
     cv_text: str
@@ -28,3 +35,13 @@ class RephraseRequest(BaseModel):
     section_content: str
     section_type: str
     job_description: str
+
+class RephraseSectionItem(BaseModel):
+    """One section in a batch rephrase request."""
+    section_content: str
+    section_type: str
+
+class RephraseSectionsRequest(BaseModel):
+    """Batch CV section rephrase request model."""
+    sections: List[RephraseSectionItem]
+    job_description: str
@@ -1,27 +1,151 @@
 """
 CV-related API routes.
 """
-import json
+import asyncio
+import hashlib
 import os
+from functools import lru_cache
+import orjson
 from fastapi import APIRouter, HTTPException, UploadFile, File
-from ..models.request_models import CVRequest, ExtractCVRequest, RephraseRequest
-from ..services.ai_service import AIService
-from ..services.vectorstore_service import VectorstoreService
-from ..services.evaluation_service import EvaluationService
-from ..services.data_transformation_service import DataTransformationService
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from ..models.request_models import CVRequest, ExtractCVRequest, RephraseRequest, RephraseSectionsRequest
+from ..services.deps import (
+    get_ai_service, get_data_transformation_service,
+    get_evaluation_service, get_vectorstore_service
+)
 from ..utils.file_processing import extract_text_from_pdf, extract_text_from_docx
 from ..utils.security import validate_uploaded_file, validate_job_description, validate_cv_text
 from ..utils.debug import print_step
 
+# Routes return ORJSONResponse instances directly so FastAPI skips running
+# jsonable_encoder over the (plain JSON) CV payloads
 router = APIRouter(prefix="/cv", tags=["CV"])
 
-# Initialize services
-ai_service = AIService()
-vectorstore_service = VectorstoreService()
-evaluation_service = EvaluationService(ai_service)
-data_transformation_service = DataTransformationService()
+# Text extractors keyed by the MIME type detected from the upload's magic bytes
+_TEXT_EXTRACTORS = {
+    "application/pdf": extract_text_from_pdf,
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": extract_text_from_docx,
+}
 
-@router.post("/tailor")
+@lru_cache(maxsize=1)
+def get_llm_cache():
+    """Return the shared LLM response cache, creating it on first call."""
+    from ..core.config import settings
+    from ..services.llm_cache import SemanticLLMCache
+    embed_fn = None
+    if settings.LLM_CACHE_SEMANTIC:
+        vectorstore_service = get_vectorstore_service()
+        embed_fn = vectorstore_service.embed_query if vectorstore_service.embeddings else None
+    return SemanticLLMCache(
+        max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+        embed_fn=embed_fn,
+        threshold=settings.LLM_CACHE_SIMILARITY_THRESHOLD,
+        ttl_seconds=settings.LLM_CACHE_TTL_SECONDS
+    )
+
+@lru_cache(maxsize=1)
+def get_tailor_cache():
+    """Return the shared whole-response cache for /cv/tailor, creating it on first call."""
+    from ..core.config import settings
+    from ..services.llm_cache import SemanticLLMCache
+    embed_fn = None
+    if settings.TAILOR_CACHE_SEMANTIC:
+        vectorstore_service = get_vectorstore_service()
+        embed_fn = vectorstore_service.embed_query if vectorstore_service.embeddings else None
+    return SemanticLLMCache(
+        max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+        embed_fn=embed_fn,
+        threshold=settings.TAILOR_CACHE_SIMILARITY_THRESHOLD,
+        ttl_seconds=settings.LLM_CACHE_TTL_SECONDS
+    )
+
+async def _extract_structured_cv_data_cached(cv_text: str, job_description: str) -> dict:
+    """
+    Extract structured CV data, reusing cached results for repeated inputs.
+    
+    Entries are scoped to the CV text hash, so a semantic match can only
+    come from the same CV; cache calls run in a worker thread because the
+    semantic tier makes blocking embedding requests.
+    """
+    cache = get_llm_cache()
+    key_text = cache.build_key_text("extract", job_description)
+    scope = hashlib.sha256(cv_text.encode("utf-8")).hexdigest()
+    cached = await asyncio.to_thread(cache.get, key_text, scope)
+    if cached is not None:
+        return cached
+    raw_ai_data = await get_ai_service().extract_structured_cv_data(cv_text, job_description)
+    await asyncio.to_thread(cache.set, key_text, raw_ai_data, scope)
+    return raw_ai_data
+
+def _summarize_cv_content(structured_content: dict) -> dict:
+    """
+    Build the debug summary of a generated CV dictionary.
+    
+    Args:
+        structured_content: CV data as returned to the client
+        
+    Returns:
+        Dictionary of counts and key fields for debug output
+    """
+    personal = structured_content.get("personal") or {}
+    experience = structured_content.get("experience", [])
+    skills = structured_content.get("skills") or {}
+    return {
+        "name": personal.get("name", "NOT_FOUND"),
+        "contact_email": personal.get("email", "NOT_FOUND"),
+        "summary_length": len(structured_content.get("professional_summary", "")),
+        "experience_count": len(experience),
+        "education_count": len(structured_content.get("education", [])),
+        "skills_technical_count": len(skills.get("technical", [])),
+        "has_enhanced_dates": any(
+            exp.get("startDateValue") or exp.get("endDateValue")
+            for exp in experience
+        )
+    }
+
+async def _tailor_cv_content(request: CVRequest, job_description: str, cv_text: str):
+    """
+    Generate the structured, tailored CV for a request (without its analysis).
+    
+    Args:
+        request: Tailoring request (its raw texts key the extraction cache)
+        job_description: Validated job description
+        cv_text: Validated CV text
+        
+    Returns:
+        Tuple of the CV dictionary and the CV chunks retrieved for evaluation
+    """
+    data_transformation_service = get_data_transformation_service()
+
+    # Retrieve the relevant CV chunks in a worker thread while the AI
+    # extraction runs; neither depends on the other
+    retrieved_docs, raw_ai_data = await asyncio.gather(
+        asyncio.to_thread(
+            get_vectorstore_service().get_relevant_documents,
+            cv_text,
+            job_description
+        ),
+        _extract_structured_cv_data_cached(request.user_cv_text, request.job_description)
+    )
+    
+    print_step("Document Retrieval", lambda: {
+        "retrieved_docs_count": len(retrieved_docs),
+        "retrieved_context_length": sum(len(doc.page_content) for doc in retrieved_docs),
+        "retrieved_context_preview": retrieved_docs[0].page_content[:200] if retrieved_docs else ""
+    }, "output")
+    
+    # Transform raw AI data to structured CVData model with enhanced dates
+    cv_data = data_transformation_service.transform_ai_data_to_cv_data(raw_ai_data)
+    
+    # Convert back to dictionary for API response
+    structured_content = data_transformation_service.cv_data_to_dict(cv_data)
+    
+    # Debug: Show the actual generated content
+    print_step("Generated CV Content Preview", lambda: _summarize_cv_content(structured_content), "output")
+    
+    return structured_content, retrieved_docs
+
+@router.post("/tailor", response_class=ORJSONResponse, response_model=None)
 async def tailor_cv(request: CVRequest):
     """
     Tailor a CV based on job description and user CV text.
@@ -29,75 +153,161 @@ async def tailor_cv(request: CVRequest):
     # Validate and sanitize inputs
     validated_job_description = validate_job_description(request.job_description)
     validated_cv_text = validate_cv_text(request.user_cv_text)
+    vectorstore_service = get_vectorstore_service()
     
-    print_step("CV Tailoring Request", {
+    print_step("CV Tailoring Request", lambda: {
         "job_description_length": len(validated_job_description),
         "user_cv_text_length": len(validated_cv_text)
     }, "input")
 
-    # Create documents from CV text
-    docs = vectorstore_service.create_documents(validated_cv_text)
-    
-    # Clear existing documents and add new ones
-    vectorstore_service.clear_vectorstore()
-    vectorstore_service.add_documents(docs)
+    # Reuse the full response for a (near-)identical job description against
+    # the same CV; semantic matches are scoped to the CV text hash
+    tailor_cache = get_tailor_cache()
+    cache_key_text = tailor_cache.build_key_text(validated_job_description)
+    cache_scope = hashlib.sha256(validated_cv_text.encode("utf-8")).hexdigest()
+    cached_content = await asyncio.to_thread(tailor_cache.get, cache_key_text, cache_scope)
+    if cached_content is not None:
+        print_step("CV Tailoring Complete", "Served from tailor cache", "output")
+        return ORJSONResponse(cached_content)
 
-    # Retrieve relevant documents
-    retrieved_docs = vectorstore_service.retrieve_documents(validated_job_description)
-    retrieved_context = "\n\n".join([doc.page_content for doc in retrieved_docs])
-    
-    print_step("Document Retrieval", {
-        "retrieved_docs_count": len(retrieved_docs),
-        "retrieved_context_length": len(retrieved_context),
-        "retrieved_context_preview": retrieved_context[:200] + "..." if len(retrieved_context) > 200 else retrieved_context
-    }, "output")
-    
     try:
-        # Generate structured CV data using AI
-        raw_ai_data = await ai_service.extract_structured_cv_data(request.user_cv_text, request.job_description)
-        
-        # Transform raw AI data to structured CVData model with enhanced dates
-        cv_data = data_transformation_service.transform_ai_data_to_cv_data(raw_ai_data)
-        
-        # Convert back to dictionary for API response
-        structured_content = data_transformation_service.cv_data_to_dict(cv_data)
-        
-        # Debug: Show the actual generated content
-        print_step("Generated CV Content Preview", {
-            "name": structured_content.get("personal", {}).get("name", "NOT_FOUND"),
-            "contact_email": structured_content.get("personal", {}).get("email", "NOT_FOUND"),
-            "summary_length": len(structured_content.get("professional_summary", "")),
-            "experience_count": len(structured_content.get("experience", [])),
-            "education_count": len(structured_content.get("education", [])),
-            "skills_technical_count": len(structured_content.get("skills", {}).get("technical", [])) if structured_content.get("skills") else 0,
-            "has_enhanced_dates": any(
-                exp.get("startDateValue") or exp.get("endDateValue") 
-                for exp in structured_content.get("experience", [])
-            )
-        }, "output")
+        structured_content, retrieved_docs = await _tailor_cv_content(
+            request, validated_job_description, validated_cv_text
+        )
 
         # Perform evaluation
-        evaluation_results = await evaluation_service.evaluate_cv_complete(
+        evaluation_results = await get_evaluation_service().evaluate_cv_complete(
             request.job_description,
-            json.dumps(structured_content),
-            retrieved_docs
+            structured_content,
+            retrieved_docs,
+            vectorstore_service.cached_embeddings
         )
         
         # Add evaluation to structured content
         structured_content['analysis'] = evaluation_results
         
-        print_step("CV Tailoring Complete", {
+        print_step("CV Tailoring Complete", lambda: {
             "final_content_keys": list(structured_content.keys()),
             "analysis_present": 'analysis' in structured_content
         }, "output")
         
-        return structured_content
+        await asyncio.to_thread(tailor_cache.set, cache_key_text, structured_content, cache_scope)
+        
+        return ORJSONResponse(structured_content)
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        print_step("CV Tailoring Error", str(e), "error")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/tailor-stream")
+async def tailor_cv_stream(request: CVRequest):
+    """
+    Tailor a CV, streaming the CV before its analysis as newline-delimited JSON.
+    
+    The first line is {"cv": {...}}, sent as soon as the CV is generated; the
+    second is {"analysis": {...}} once evaluation finishes, or {"error": "..."}
+    if it fails.
+    """
+    validated_job_description = validate_job_description(request.job_description)
+    validated_cv_text = validate_cv_text(request.user_cv_text)
+    vectorstore_service = get_vectorstore_service()
+    
+    print_step("CV Tailoring Stream Request", lambda: {
+        "job_description_length": len(validated_job_description),
+        "user_cv_text_length": len(validated_cv_text)
+    }, "input")
+    
+    tailor_cache = get_tailor_cache()
+    cache_key_text = tailor_cache.build_key_text(validated_job_description)
+    cache_scope = hashlib.sha256(validated_cv_text.encode("utf-8")).hexdigest()
+    cached_content = await asyncio.to_thread(tailor_cache.get, cache_key_text, cache_scope)
+    if cached_content is not None:
+        print_step("CV Tailoring Complete", "Served from tailor cache", "output")
+        analysis = cached_content.pop('analysis', None)
+        return StreamingResponse(
+            iter((orjson.dumps({"cv": cached_content}) + b"\n", orjson.dumps({"analysis": analysis}) + b"\n")),
+            media_type="application/x-ndjson"
+        )
+    
+    # Generate the CV before sending headers, so a busy server (429) or a
+    # failed generation still surfaces as an HTTP error
+    try:
+        structured_content, retrieved_docs = await _tailor_cv_content(
+            request, validated_job_description, validated_cv_text
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         print_step("CV Tailoring Error", str(e), "error")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    async def lines():
+        yield orjson.dumps({"cv": structured_content}) + b"\n"
+        try:
+            evaluation_results = await get_evaluation_service().evaluate_cv_complete(
+                request.job_description,
+                structured_content,
+                retrieved_docs,
+                vectorstore_service.cached_embeddings
+            )
+        except Exception as e:
+            print_step("CV Tailoring Error", str(e), "error")
+            yield orjson.dumps({"error": str(e)}) + b"\n"
+            return
+        yield orjson.dumps({"analysis": evaluation_results}) + b"\n"
+        
+        print_step("CV Tailoring Complete", "Streamed CV and analysis", "output")
+        await asyncio.to_thread(
+            tailor_cache.set, cache_key_text, {**structured_content, 'analysis': evaluation_results}, cache_scope
+        )
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"Cache-Control": "no-cache"})
 
-@router.post("/tailor-from-file")
+@router.post("/generate-stream")
+async def generate_cv_stream(request: CVRequest):
+    """
+    Generate a tailored CV as free text, streamed as server-sent events.
+    
+    Each event carries {"delta": "..."}; the stream ends with "data: [DONE]".
+    """
+    validated_job_description = validate_job_description(request.job_description)
+    validated_cv_text = validate_cv_text(request.user_cv_text)
+    
+    print_step("CV Generation Stream Request", lambda: {
+        "job_description_length": len(validated_job_description),
+        "user_cv_text_length": len(validated_cv_text)
+    }, "input")
+    
+    stream = get_ai_service().generate_cv_from_text_stream(validated_job_description, validated_cv_text)
+    
+    # Wait for the first delta before sending headers, so a busy server (429)
+    # or a failed API call still surfaces as an HTTP error
+    try:
+        first_delta = await anext(stream, "")
+    except HTTPException:
+        raise
+    except Exception as e:
+        print_step("CV Generation Stream Error", str(e), "error")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def events():
+        try:
+            if first_delta:
+                yield b"data: " + orjson.dumps({"delta": first_delta}) + b"\n\n"
+            async for delta in stream:
+                yield b"data: " + orjson.dumps({"delta": delta}) + b"\n\n"
+            yield b"data: [DONE]\n\n"
+        except Exception as e:
+            print_step("CV Generation Stream Error", str(e), "error")
+            yield b"event: error\ndata: " + orjson.dumps({"detail": str(e)}) + b"\n\n"
+        finally:
+            await stream.aclose()
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.post("/tailor-from-file", response_class=ORJSONResponse, response_model=None)
 async def tailor_cv_from_file(job_description: str, cv_file: UploadFile = File(...)):
     """
     Tailor a CV from uploaded file.
@@ -105,11 +315,12 @@ async def tailor_cv_from_file(job_description: str, cv_file: UploadFile = File(.
     # Validate job description
     validated_job_description = validate_job_description(job_description)
     
-    # Read file content
-    file_content = await cv_file.read()
+    # Read at most one byte past the limit so oversized uploads are rejected
+    # without buffering them whole
+    from ..core.config import settings
+    file_content = await cv_file.read(settings.MAX_FILE_SIZE + 1)
     
     # Validate uploaded file
-    from ..core.config import settings
     validation_result = validate_uploaded_file(
         file_content=file_content,
         filename=cv_file.filename or "unknown",
@@ -117,23 +328,21 @@ async def tailor_cv_from_file(job_description: str, cv_file: UploadFile = File(.
         max_size=settings.MAX_FILE_SIZE
     )
     
-    print_step("File Upload Request", {
+    print_step("File Upload Request", lambda: {
         "filename": validation_result["sanitized_filename"],
         "content_type": validation_result["mime_type"],
         "file_size": validation_result["file_size"],
         "job_description_length": len(validated_job_description)
     }, "input")
     
-    print_step("File Type Detection", {"filename": cv_file.filename}, "input")
-    if cv_file.filename.endswith(".pdf"):
-        user_cv_text = extract_text_from_pdf(file_content)
-    elif cv_file.filename.endswith(".docx"):
-        user_cv_text = extract_text_from_docx(file_content)
-    else:
+    print_step("File Type Detection", lambda: {"mime_type": validation_result["mime_type"]}, "input")
+    extractor = _TEXT_EXTRACTORS.get(validation_result["mime_type"])
+    if extractor is None:
         print_step("File Type Detection", "Unsupported file type", "error")
         raise HTTPException(status_code=400, detail="Unsupported file type.")
+    user_cv_text = await asyncio.to_thread(extractor, file_content)
     
-    print_step("CV Request Creation", {
+    print_step("CV Request Creation", lambda: {
         "job_description_length": len(job_description),
         "extracted_text_length": len(user_cv_text)
     }, "input")
@@ -143,35 +352,19 @@ async def tailor_cv_from_file(job_description: str, cv_file: UploadFile = File(.
     
     return await tailor_cv(rag_request)
 
-@router.post("/extract-cv-data")
+@router.post("/extract-cv-data", response_class=ORJSONResponse, response_model=None)
 async def extract_cv_data(request: ExtractCVRequest):
     """
     Extract structured CV data from text using AI.
     """
-    print_step("CV Data Extraction Request", {
+    print_step("CV Data Extraction Request", lambda: {
         "cv_text_length": len(request.cv_text),
         "job_description_length": len(request.job_description)
     }, "input")
 
     try:
-        # Create documents from CV text
-        docs = vectorstore_service.create_documents(request.cv_text)
-        
-        # Clear existing documents and add new ones
-        vectorstore_service.clear_vectorstore()
-        vectorstore_service.add_documents(docs)
-
-        # Retrieve relevant documents
-        retrieved_docs = vectorstore_service.retrieve_documents(request.job_description)
-        retrieved_context = "\n\n".join([doc.page_content for doc in retrieved_docs])
-        
-        print_step("Document Retrieval", {
-            "retrieved_docs_count": len(retrieved_docs),
-            "retrieved_context_length": len(retrieved_context)
-        }, "output")
-        
-        # Generate structured CV data using AI
-        raw_ai_data = await ai_service.extract_structured_cv_data(request.cv_text, request.job_description)
+        data_transformation_service = get_data_transformation_service()
+        raw_ai_data = await _extract_structured_cv_data_cached(request.cv_text, request.job_description)
         
         # Transform raw AI data to structured CVData model with enhanced dates
         cv_data = data_transformation_service.transform_ai_data_to_cv_data(raw_ai_data)
@@ -179,54 +372,97 @@ async def extract_cv_data(request: ExtractCVRequest):
         # Convert back to dictionary for API response
         structured_content = data_transformation_service.cv_data_to_dict(cv_data)
         
-        print_step("CV Data Extraction Complete", {
+        print_step("CV Data Extraction Complete", lambda: {
             "extracted_keys": list(structured_content.keys()),
-            "name": structured_content.get("personal", {}).get("name", "NOT_FOUND"),
-            "experience_count": len(structured_content.get("experience", [])),
-            "education_count": len(structured_content.get("education", [])),
-            "has_enhanced_dates": any(
-                exp.get("startDateValue") or exp.get("endDateValue") 
-                for exp in structured_content.get("experience", [])
-            )
+            **_summarize_cv_content(structured_content)
         }, "output")
         
-        return structured_content
+        return ORJSONResponse(structured_content)
 
+    except HTTPException:
+        raise
     except Exception as e:
         print_step("CV Data Extraction Error", str(e), "error")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/rephrase-section")
+@router.post("/rephrase-section", response_class=ORJSONResponse, response_model=None)
 async def rephrase_cv_section(request: RephraseRequest):
     """
     Rephrase a specific CV section to better fit the target job.
     """
-    print_step("CV Section Rephrase Request", {
+    print_step("CV Section Rephrase Request", lambda: {
         "section_type": request.section_type,
         "section_content_length": len(request.section_content),
         "job_description_length": len(request.job_description)
     }, "input")
 
     try:
-        # Use AI service to rephrase the section
-        rephrased_content = await ai_service.rephrase_cv_section(
+        # Not cached: rephrasing samples at a creative temperature, so asking
+        # again should give a different wording
+        rephrased_content = await get_ai_service().rephrase_cv_section(
             request.section_content,
             request.section_type,
             request.job_description
         )
         
-        print_step("CV Section Rephrase Complete", {
+        print_step("CV Section Rephrase Complete", lambda: {
             "original_length": len(request.section_content),
             "rephrased_length": len(rephrased_content),
             "section_type": request.section_type
         }, "output")
         
-        return {
+        return ORJSONResponse({
             "original_content": request.section_content,
             "rephrased_content": rephrased_content,
             "section_type": request.section_type
-        }
+        })
 
+    except HTTPException:
+        raise
     except Exception as e:
         print_step("CV Section Rephrase Error", str(e), "error")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/rephrase-sections", response_class=ORJSONResponse, response_model=None)
+async def rephrase_cv_sections(request: RephraseSectionsRequest):
+    """
+    Rephrase several CV sections for the same job with a single AI request.
+    """
+    print_step("CV Sections Rephrase Request", lambda: {
+        "section_types": [section.section_type for section in request.sections],
+        "job_description_length": len(request.job_description)
+    }, "input")
+
+    if not request.sections:
+        raise HTTPException(status_code=400, detail="No sections to rephrase.")
+
+    try:
+        # Not cached, like /rephrase-section: each request samples fresh wordings
+        rephrased = await get_ai_service().rephrase_cv_sections(
+            [
+                {"section_type": section.section_type, "section_content": section.section_content}
+                for section in request.sections
+            ],
+            request.job_description
+        )
+        
+        print_step("CV Sections Rephrase Complete", lambda: {
+            "section_count": len(request.sections)
+        }, "output")
+        
+        return ORJSONResponse({
+            "sections": [
+                {
+                    "original_content": section.section_content,
+                    "rephrased_content": content,
+                    "section_type": section.section_type
+                }
+                for section, content in zip(request.sections, rephrased)
+            ]
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print_step("CV Sections Rephrase Error", str(e), "error")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -2,40 +2,72 @@
 CV evaluation API routes.
 """
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from ..models.request_models import EvaluationRequest
-from ..services.evaluation_service import EvaluationService
-from ..services.ai_service import AIService
+from ..services.deps import get_evaluation_service
 from ..utils.debug import print_step
 
 router = APIRouter(prefix="/evaluation", tags=["Evaluation"])
 
-# Initialize services
-ai_service = AIService()
-evaluation_service = EvaluationService(ai_service)
-
-@router.post("/cv")
+@router.post("/cv", response_class=ORJSONResponse, response_model=None)
 async def evaluate_cv(request: EvaluationRequest):
     """
     Perform a committee evaluation on a provided CV JSON against a job description.
     """
-    print_step("Committee Evaluation Request", {
+    print_step("Committee Evaluation Request", lambda: {
         "job_description_length": len(request.job_description),
         "cv_keys": list(request.cv_json.keys())
     }, "input")
 
     try:
-        # Convert the CV JSON object back to a string for the LLM prompt
-        import json
-        cv_content_str = json.dumps(request.cv_json, indent=2)
-
         # Perform committee evaluation
-        committee_analysis = await evaluation_service.evaluate_cv_with_committee(
+        committee_analysis = await get_evaluation_service().evaluate_cv_with_committee(
             request.job_description,
-            cv_content_str
+            request.cv_json_str
         )
         
-        return committee_analysis
+        return ORJSONResponse(committee_analysis)
 
+    except HTTPException:
+        raise
     except Exception as e:
         print_step("Committee Evaluation Error", str(e), "error")
         raise HTTPException(status_code=500, detail=f"Error during evaluation: {e}")
+
+@router.post("/cv/batch", response_class=ORJSONResponse, response_model=None)
+async def submit_cv_evaluation_batch(request: EvaluationRequest):
+    """
+    Queue a committee evaluation on the OpenAI Batch API (completes within 24h).
+    """
+    print_step("Committee Evaluation Batch Request", lambda: {
+        "job_description_length": len(request.job_description),
+        "cv_keys": list(request.cv_json.keys())
+    }, "input")
+
+    try:
+        batch_id = await get_evaluation_service().submit_committee_evaluation(
+            request.job_description,
+            request.cv_json_str
+        )
+        
+        return ORJSONResponse({"batch_id": batch_id}, status_code=202)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print_step("Committee Evaluation Batch Error", str(e), "error")
+        raise HTTPException(status_code=500, detail=f"Error submitting evaluation: {e}")
+
+@router.get("/cv/batch/{batch_id}", response_class=ORJSONResponse, response_model=None)
+async def poll_cv_evaluation_batch(batch_id: str):
+    """
+    Get the status of a queued committee evaluation, with results once completed.
+    """
+    try:
+        return ORJSONResponse(await get_evaluation_service().poll_committee_evaluation(batch_id))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print_step("Committee Evaluation Batch Error", str(e), "error")
+        raise HTTPException(status_code=500, detail=f"Error retrieving evaluation: {e}")
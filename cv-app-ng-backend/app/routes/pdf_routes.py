@@ -1,37 +1,44 @@
 """
 PDF generation API routes.
 """
-from fastapi import APIRouter, HTTPException
+import hashlib
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
 from ..models.cv_models import PDFRequest
-from ..services.pdf_service import PDFService
+from ..services.deps import get_pdf_service
 from ..utils.debug import print_step
 
 router = APIRouter(prefix="/pdf", tags=["PDF"])
 
-# Initialize PDF service
-pdf_service = PDFService()
-
 @router.post("/generate")
 async def generate_pdf(request: PDFRequest):
     """
     Generate a PDF from CV data using the specified template.
     """
     try:
-        return await pdf_service.generate_pdf(request)
+        return await get_pdf_service().generate_pdf(request)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         print_step("PDF Generation Error", str(e), "error")
         raise HTTPException(status_code=500, detail=f"Error generating PDF: {e}")
 
-@router.get("/templates")
-async def get_available_templates():
+@router.get("/templates", response_class=ORJSONResponse, response_model=None)
+async def get_available_templates(request: Request):
     """
     Get list of available PDF templates.
+    
+    Responses carry an ETag so clients can revalidate with If-None-Match
+    and receive an empty 304 when the template list is unchanged.
     """
     try:
-        templates = pdf_service.get_available_templates()
-        return {"templates": templates}
+        templates = get_pdf_service().get_available_templates()
+        etag = '"' + hashlib.sha256("\n".join(templates).encode("utf-8")).hexdigest()[:32] + '"'
+        headers = {"ETag": etag, "Cache-Control": "public, max-age=300"}
+        
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return ORJSONResponse({"templates": templates}, headers=headers)
     except Exception as e:
         print_step("Template List Error", str(e), "error")
         raise HTTPException(status_code=500, detail=f"Error getting templates: {e}")
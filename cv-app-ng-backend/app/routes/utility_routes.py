@@ -1,57 +1,116 @@
 """
 Utility API routes for audio transcription and image analysis.
 """
-import os
+import base64
+import binascii
+import hashlib
 from fastapi import APIRouter, HTTPException, UploadFile, File
+from ..core.config import settings
 from ..models.request_models import ImageRequest
-from ..services.ai_service import AIService
+from ..services.deps import get_ai_service
+from ..services.llm_cache import SemanticLLMCache
 from ..utils.debug import print_step
+from ..utils.security import sanitize_filename, validate_uploaded_file
 
 router = APIRouter(prefix="/utility", tags=["Utility"])
 
-# Initialize AI service
-ai_service = AIService()
+# Extracted job description text keyed by SHA-256 of the image bytes
+_image_text_cache = SemanticLLMCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES, ttl_seconds=settings.LLM_CACHE_TTL_SECONDS
+)
 
 @router.post("/transcribe-audio")
 async def transcribe_audio(audio_file: UploadFile = File(...)):
     """
     Transcribe audio file to text.
     """
-    print_step("Audio Transcription Request", {
+    print_step("Audio Transcription Request", lambda: {
         "filename": audio_file.filename,
         "content_type": audio_file.content_type
     }, "input")
     
-    file_location = f"/tmp/{audio_file.filename}"
-    try:
-        print_step("Audio File Processing", {"file_location": file_location}, "input")
-        with open(file_location, "wb+") as file_object:
-            file_object.write(audio_file.file.read())
-        print_step("Audio File Processing", "File written to temporary location", "output")
-        
-        # Transcribe audio
-        transcription = await ai_service.transcribe_audio(file_location)
-        
-        return {"transcription": transcription}
-    finally:
-        if os.path.exists(file_location):
-            print_step("Cleanup", "Removing temporary audio file", "info")
-            os.remove(file_location)
+    # The upload is already spooled by Starlette (in memory, spilling to an
+    # anonymous temp file when large), so stream it to the API as-is
+    await audio_file.seek(0)
+    transcription = await get_ai_service().transcribe_audio(
+        audio_file.file, sanitize_filename(audio_file.filename or "audio.webm")
+    )
+    
+    return {"transcription": transcription}
 
 @router.post("/analyze-jd-image")
 async def analyze_jd_image(request: ImageRequest):
     """
     Analyze job description image and extract text.
     """
-    print_step("Image Analysis Request", {
+    print_step("Image Analysis Request", lambda: {
         "image_base64_length": len(request.image_base_64)
     }, "input")
     
+    # Reject oversized payloads before decoding (base64 is 4 chars per 3 bytes)
+    if len(request.image_base_64) > (settings.MAX_IMAGE_SIZE + 2) // 3 * 4:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Image too large. Maximum size: {settings.MAX_IMAGE_SIZE} bytes"
+        )
+    try:
+        image = base64.b64decode(request.image_base_64, validate=True)
+    except binascii.Error:
+        raise HTTPException(status_code=400, detail="Invalid base64 image data.")
+    
+    return await _extract_job_description(image, "job-description-image")
+
+@router.post("/analyze-jd-image-from-file")
+async def analyze_jd_image_from_file(image_file: UploadFile = File(...)):
+    """
+    Analyze an uploaded job description image and extract text.
+    
+    Takes the raw image as multipart form data, avoiding the base64 encoding
+    (a third larger) that /analyze-jd-image requires.
+    """
+    print_step("Image Analysis Request", lambda: {
+        "filename": image_file.filename,
+        "content_type": image_file.content_type
+    }, "input")
+    
+    # Read at most one byte past the limit so oversized uploads are rejected
+    # without buffering them whole
+    image = await image_file.read(settings.MAX_IMAGE_SIZE + 1)
+    return await _extract_job_description(image, image_file.filename or "job-description-image")
+
+async def _extract_job_description(image: bytes, filename: str) -> dict:
+    """
+    Validate an image and extract the job description text from it.
+    
+    Args:
+        image: Raw image bytes
+        filename: Name used for upload validation
+        
+    Returns:
+        Response body with the extracted job description
+    """
+    validation_result = validate_uploaded_file(
+        file_content=image,
+        filename=filename,
+        allowed_types=settings.ALLOWED_IMAGE_TYPES,
+        max_size=settings.MAX_IMAGE_SIZE
+    )
+    
+    cache_key = hashlib.sha256(image).hexdigest()
+    cached = _image_text_cache.get(cache_key)
+    if cached is not None:
+        return {"extracted_job_description": cached}
+    
     try:
         # Analyze image
-        extracted_text = await ai_service.analyze_image(request.image_base_64)
+        extracted_text = await get_ai_service().analyze_job_description_image(
+            image, validation_result["mime_type"]
+        )
+        _image_text_cache.set(cache_key, extracted_text)
         
         return {"extracted_job_description": extracted_text}
+    except HTTPException:
+        raise
     except Exception as e:
         print_step("Image Analysis Error", str(e), "error")
         raise HTTPException(status_code=500, detail=f"Error analyzing image: {e}")
@@ -1,10 +1,17 @@
 """
 Service layer for the CV Builder application.
+
+Services are imported on first attribute access, so importing a submodule
+(e.g. deps) does not pull in every service's heavy dependencies.
 """
-from .ai_service import AIService
-from .evaluation_service import EvaluationService
-from .pdf_service import PDFService
-from .vectorstore_service import VectorstoreService
+from importlib import import_module
+
+_SERVICE_MODULES = {
+    "AIService": ".ai_service",
+    "EvaluationService": ".evaluation_service",
+    "PDFService": ".pdf_service",
+    "VectorstoreService": ".vectorstore_service",
+}
 
 __all__ = [
     "AIService",
@@ -12,3 +19,8 @@ __all__ = [
     "PDFService",
     "VectorstoreService"
 ]
+
+def __getattr__(name):
+    if name in _SERVICE_MODULES:
+        return getattr(import_module(_SERVICE_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,11 +2,297 @@
 AI Service for handling OpenAI interactions.
 Follows Single Responsibility Principle - handles only AI-related operations.
 """
+import asyncio
+import base64
+import importlib.util
 import os
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+import httpx
+import orjson
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from string import Template
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, List, Optional
+from fastapi import HTTPException
+from openai import AsyncOpenAI
 from ..core.config import settings
 from ..utils.debug import print_step
+from .llm_cache import SemanticLLMCache
+
+# Replies are only cached for (near-)deterministic sampling
+_CACHEABLE_MAX_TEMPERATURE = 0.3
+
+# Rough characters per token, used when the tokenizer is unavailable
+_CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=1)
+def _token_encoder():
+    """Return the cl100k tokenizer, or None if it cannot be loaded (e.g. offline)."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"Warning: tiktoken unavailable, truncating prompts by characters: {e}")
+        return None
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text to at most max_tokens tokens.
+    
+    Args:
+        text: User-provided text to interpolate into a prompt
+        max_tokens: Token budget for the text
+        
+    Returns:
+        The text, truncated if it exceeds the budget
+    """
+    # No token is shorter than one character, so short text needs no encoding
+    if len(text) <= max_tokens:
+        return text
+    encoder = _token_encoder()
+    if encoder is None:
+        return text[:max_tokens * _CHARS_PER_TOKEN]
+    tokens = encoder.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoder.decode(tokens[:max_tokens])
+
+def _fit_job_description(job_description: str) -> str:
+    """Truncate a job description to its prompt budget."""
+    return _truncate_tokens(job_description, settings.PROMPT_JOB_DESCRIPTION_MAX_TOKENS)
+
+def _fit_cv(cv_text: str) -> str:
+    """Truncate CV text to its prompt budget."""
+    return _truncate_tokens(cv_text, settings.PROMPT_CV_MAX_TOKENS)
+
+# Fixed extraction instructions, sent as the system message so every
+# extraction request shares the same prompt prefix
+_CV_EXTRACTION_INSTRUCTIONS = """You are an expert at extracting structured data from CVs. Always return valid JSON.
+
+Please extract and return the following information in JSON format:
+{
+    "personal": {
+        "name": "Full name",
+        "email": "email@example.com",
+        "phone": "phone number",
+        "location": "city, country",
+        "website": "website URL or empty string",
+        "linkedin": "LinkedIn URL or empty string",
+        "github": "GitHub URL or empty string"
+    },
+    "professional_summary": "Brief professional summary",
+    "experience": [
+        {
+            "role": "Job title",
+            "company": "Company name",
+            "startDate": "Start date (e.g., 'Jan 2023', '2023', 'Present')",
+            "endDate": "End date (e.g., 'Dec 2023', 'Present', 'Current')",
+            "location": "Job location",
+            "description": "Job description",
+            "achievements": ["achievement 1", "achievement 2"]
+        }
+    ],
+    "education": [
+        {
+            "degree": "Degree name",
+            "institution": "Institution name",
+            "field": "Field of study",
+            "startDate": "Start date (e.g., 'Sep 2020', '2020')",
+            "endDate": "End date (e.g., 'May 2023', '2023', 'Present')",
+            "gpa": "GPA if mentioned or empty string"
+        }
+    ],
+    "projects": [
+        {
+            "name": "Project name",
+            "description": "Project description",
+            "tech_stack": ["technology1", "technology2"],
+            "link": "Project URL or empty string",
+            "startDate": "Start date if available or null",
+            "endDate": "End date if available or null"
+        }
+    ],
+    "skills": {
+        "technical": ["skill1", "skill2"],
+        "soft": ["skill1", "skill2"],
+        "languages": ["language1", "language2"]
+    },
+    "licenses_certifications": [
+        {
+            "name": "Certification name",
+            "issuer": "Issuing organization",
+            "date": "Issue date (e.g., 'Jan 2023', '2023')",
+            "expiry": "Expiry date if applicable or null"
+        }
+    ]
+}
+
+Important date formatting guidelines:
+- Use "Present" or "Current" for ongoing positions/education
+- Use formats like "Jan 2023", "2023", "Sep 2020 - May 2023"
+- If only year is available, use just the year (e.g., "2023")
+- If month and year are available, use "Jan 2023" format
+
+Return only the JSON object, no additional text."""
+
+
+_GENERATE_CV_PROMPT = Template("""Based on the following job description and user experience, generate a tailored CV:
+
+Job Description:
+$job_description
+
+User Experience:
+$user_experience
+
+Please generate a professional CV that highlights relevant skills and experience.""")
+
+_EXTRACT_CV_PROMPT = Template("""Extract structured data from the following CV text and format it as JSON.
+The job description is provided for context to help identify relevant information.
+
+Job Description:
+$job_description
+
+CV Text:
+$cv_text""")
+
+_GENERATE_CV_FROM_FILE_PROMPT = Template("""Based on the following existing CV content and job description, generate an improved, tailored CV:
+
+Existing CV Content:
+$file_content
+
+Job Description:
+$job_description
+
+Please improve and tailor the CV to better match the job requirements.""")
+
+
+# Section-specific rephrasing roles, keyed by section type
+_SECTION_PROMPTS = {
+    'professional_summary': "You are a professional CV writer. Rephrase this professional summary to better align with the target job requirements while maintaining authenticity.",
+    'experience': "You are a professional CV writer. Rephrase this work experience description to better highlight relevant skills and achievements for the target job.",
+    'project': "You are a professional CV writer. Rephrase this project description to better showcase relevant technical skills and impact for the target job.",
+    'education': "You are a professional CV writer. Rephrase this education section to better emphasize relevant coursework, achievements, or projects for the target job.",
+    'skills': "You are a professional CV writer. Rephrase and reorganize these skills to better match the target job requirements and highlight the most relevant ones first.",
+    'certification': "You are a professional CV writer. Rephrase this certification description to better emphasize its relevance to the target job."
+}
+_DEFAULT_SECTION_PROMPT = "You are a professional CV writer. Rephrase this CV section to better align with the target job requirements."
+
+_REPHRASE_INSTRUCTIONS = """Instructions:
+1. Rephrase the content to better match the job requirements
+2. Use action verbs and quantifiable achievements where possible
+3. Highlight relevant technical skills and technologies mentioned in the job description
+4. Maintain professional tone and authenticity
+5. Keep the same length or slightly shorter
+6. Focus on impact and results rather than just responsibilities
+7. Use keywords from the job description naturally"""
+
+_REPHRASE_PROMPT = Template("""$role
+
+Job Description:
+$job_description
+
+Current $section_label Content:
+$section_content
+
+""" + _REPHRASE_INSTRUCTIONS + """
+
+Return only the rephrased content, no additional text or explanations.""")
+
+_REPHRASE_BATCH_PROMPT = Template("""Rephrase each CV section in the JSON array below for the target job, acting as the "role" given for that section.
+
+Job Description:
+$job_description
+
+Sections:
+$sections
+
+""" + _REPHRASE_INSTRUCTIONS + """
+
+Return a JSON object {"sections": [{"id": <id>, "rephrased": "<rephrased content>"}, ...]} with one entry per input section.""")
+
+
+# Committee persona scoring, shared by the synchronous and Batch API paths
+_PERSONA_MODEL = "gpt-4o-mini"
+
+# Persona-independent text comes first, so the calls for every persona (and
+# repeat evaluations) share a long prefix that OpenAI's prompt cache can serve
+_PERSONA_SYSTEM = """You are a member of a hiring committee. Score the provided CV based on the job description from your assigned perspective.
+Return JSON with "persona", "score", "justification".
+IMPORTANT: The "persona" field in your JSON response must exactly match the role you are acting as. Do not use any other name or value for this field."""
+
+_PERSONA_PROMPT = Template("""JOB: $job_description
+CV: $cv_content
+You will act as: $persona.""")
+
+def _persona_prompt(persona: str, job_description: str, cv_content: str) -> str:
+    """Build the scoring prompt for one committee persona."""
+    return _PERSONA_PROMPT.substitute(
+        persona=persona,
+        job_description=_fit_job_description(job_description),
+        cv_content=_fit_cv(cv_content)
+    )
+
+_PANEL_PROMPT = Template("""You will act, in turn, as each member of a hiring committee: $personas.
+Score the provided CV based on the job description from each member's perspective, independently.
+Return one evaluation per member, with "persona" exactly matching the member's name as listed.
+JOB: $job_description
+CV: $cv_content""")
+
+# Structured Outputs schema: the reply is guaranteed to parse and match it
+_PANEL_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "committee_evaluations",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "evaluations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "persona": {"type": "string"},
+                            "score": {"type": "number"},
+                            "justification": {"type": "string"}
+                        },
+                        "required": ["persona", "score", "justification"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["evaluations"],
+            "additionalProperties": False
+        }
+    }
+}
+
+_CV_SUMMARY_PROMPT = Template("""Summarize the CV below for a hiring committee in at most 400 words.
+Keep every role (title, company, dates), education, certifications, the technical skills,
+and quantified achievements. Use terse bullet points and do not add anything that is not in the CV.
+
+CV:
+$cv_content""")
+
+# Legacy free-text committee (evaluate_cv_with_committee): (name, system prompt)
+_COMMITTEE_PERSONAS = (
+    ("Technical Recruiter", "You are a technical recruiter. Evaluate this CV for technical skills and experience relevant to the job."),
+    ("HR Manager", "You are an HR manager. Evaluate this CV for cultural fit, communication skills, and overall presentation."),
+    ("Hiring Manager", "You are a hiring manager. Evaluate this CV for role-specific qualifications and potential for success."),
+)
+
+_COMMITTEE_PROMPT = Template("""$role
+
+Job Description:
+$job_description
+
+CV Content:
+$cv_content
+
+Please provide:
+1. Overall score (1-10)
+2. Strengths
+3. Areas for improvement
+4. Recommendation (Hire/Maybe/No)""")
 
 
 class AIService:
@@ -17,22 +303,84 @@ class AIService:
     
     def __init__(self):
         """Initialize the AI service with OpenAI client."""
+        self._llm_slots = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        self._reply_cache = SemanticLLMCache(
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES, ttl_seconds=settings.LLM_CACHE_TTL_SECONDS
+        )
         self._initialize_openai_client()
         self._initialize_embeddings()
     
     def _initialize_openai_client(self):
         """Initialize OpenAI client."""
-        print_step("OpenAI Client Initialization", {"api_key_present": bool(settings.OPENAI_API_KEY)}, "input")
+        print_step("OpenAI Client Initialization", lambda: {"api_key_present": bool(settings.OPENAI_API_KEY)}, "input")
         
         if not settings.OPENAI_API_KEY:
             raise ValueError("OpenAI API key is required")
         
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        # One pooled HTTP client per process keeps TLS connections alive across requests
+        http_client = httpx.AsyncClient(
+            http2=settings.OPENAI_HTTP2 and importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY
+            ),
+            # Fail fast on an unreachable host; completions keep the long read timeout
+            timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT)
+        )
+        self.client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            http_client=http_client
+        )
         print_step("OpenAI Client Initialization", "OpenAI client initialized successfully", "output")
     
+    async def aclose(self) -> None:
+        """Close the OpenAI client's connection pool."""
+        await self.client.close()
+    
+    @asynccontextmanager
+    async def _llm_slot(self) -> AsyncIterator[None]:
+        """
+        Hold one of the per-process OpenAI concurrency slots.
+        
+        Raises:
+            HTTPException: 429 if no slot frees up within LLM_QUEUE_TIMEOUT
+        """
+        try:
+            await asyncio.wait_for(self._llm_slots.acquire(), timeout=settings.LLM_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            print_step("OpenAI Concurrency Limit", lambda: {
+                "max_concurrency": settings.LLM_MAX_CONCURRENCY,
+                "queue_timeout": settings.LLM_QUEUE_TIMEOUT
+            }, "error")
+            raise HTTPException(status_code=429, detail="Server busy, please retry shortly")
+        
+        try:
+            yield
+        finally:
+            self._llm_slots.release()
+    
+    async def _call_openai(self, create: Callable[..., Any], **kwargs) -> Any:
+        """
+        Call an OpenAI endpoint within the per-process concurrency limit.
+        
+        Args:
+            create: Async SDK method to call (e.g. self.client.chat.completions.create)
+            **kwargs: Arguments for the SDK method
+            
+        Returns:
+            The SDK response
+            
+        Raises:
+            HTTPException: 429 if no slot frees up within LLM_QUEUE_TIMEOUT
+        """
+        async with self._llm_slot():
+            return await create(**kwargs)
+    
     def _initialize_embeddings(self):
         """Initialize embeddings model."""
-        print_step("Embeddings Initialization", {"api_key_present": bool(settings.OPENAI_API_KEY)}, "input")
+        print_step("Embeddings Initialization", lambda: {"api_key_present": bool(settings.OPENAI_API_KEY)}, "input")
         
         if not settings.OPENAI_API_KEY:
             raise ValueError("OpenAI API key is required for embeddings")
@@ -41,6 +389,91 @@ class AIService:
         # For now, we'll use the same client
         print_step("Embeddings Initialization", "OpenAI embeddings initialized successfully", "output")
     
+    async def _chat(self, user: str, system: Optional[str] = None, model: str = "gpt-4", **kwargs) -> str:
+        """
+        Run a single-turn chat completion and return the reply text.
+        
+        Replies to low-temperature requests are cached by a hash of the
+        full request, so identical prompts skip the API.
+        
+        Args:
+            user: User message
+            system: System message (optional)
+            model: Chat model name
+            **kwargs: Extra completion arguments (max_tokens, temperature, ...)
+            
+        Returns:
+            Content of the first choice
+        """
+        cache_key = None
+        if kwargs.get("temperature", 1.0) <= _CACHEABLE_MAX_TEMPERATURE:
+            cache_key = orjson.dumps(
+                {"model": model, "system": system, "user": user, **kwargs},
+                option=orjson.OPT_SORT_KEYS
+            ).decode()
+            cached = self._reply_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        messages = [{"role": "user", "content": user}]
+        if system is not None:
+            messages.insert(0, {"role": "system", "content": system})
+        response = await self._call_openai(
+            self.client.chat.completions.create, model=model, messages=messages, **kwargs
+        )
+        content = response.choices[0].message.content
+        
+        if cache_key is not None:
+            self._reply_cache.set(cache_key, content)
+        return content
+    
+    async def _chat_stream(self, user: str, system: Optional[str] = None, model: str = "gpt-4", **kwargs) -> AsyncIterator[str]:
+        """
+        Stream a single-turn chat completion as it is generated.
+        
+        The concurrency slot is held until the stream is exhausted or closed.
+        
+        Args:
+            user: User message
+            system: System message (optional)
+            model: Chat model name
+            **kwargs: Extra completion arguments (max_tokens, temperature, ...)
+            
+        Yields:
+            Non-empty content deltas of the first choice
+        """
+        messages = [{"role": "user", "content": user}]
+        if system is not None:
+            messages.insert(0, {"role": "system", "content": system})
+        async with self._llm_slot():
+            stream = await self.client.chat.completions.create(
+                model=model, messages=messages, stream=True, **kwargs
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+    
+    def generate_cv_from_text_stream(self, job_description: str, user_experience: str) -> AsyncIterator[str]:
+        """
+        Stream a tailored CV as it is generated (see generate_cv_from_text).
+        
+        Args:
+            job_description: The job description to tailor the CV for
+            user_experience: The user's experience and background
+            
+        Returns:
+            Async iterator of generated text deltas
+        """
+        return self._chat_stream(
+            _GENERATE_CV_PROMPT.substitute(
+                job_description=_fit_job_description(job_description),
+                user_experience=_fit_cv(user_experience)
+            ),
+            system="You are a professional CV writer. Generate tailored CVs based on job descriptions.",
+            max_tokens=2000,
+            temperature=0.7
+        )
+    
     async def generate_cv_from_text(self, job_description: str, user_experience: str) -> str:
         """
         Generate a tailored CV based on job description and user experience.
@@ -53,30 +486,18 @@ class AIService:
             Generated CV content
         """
         try:
-            prompt = f"""
-            Based on the following job description and user experience, generate a tailored CV:
-            
-            Job Description:
-            {job_description}
-            
-            User Experience:
-            {user_experience}
-            
-            Please generate a professional CV that highlights relevant skills and experience.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a professional CV writer. Generate tailored CVs based on job descriptions."},
-                    {"role": "user", "content": prompt}
-                ],
+            return await self._chat(
+                _GENERATE_CV_PROMPT.substitute(
+                    job_description=_fit_job_description(job_description),
+                    user_experience=_fit_cv(user_experience)
+                ),
+                system="You are a professional CV writer. Generate tailored CVs based on job descriptions.",
                 max_tokens=2000,
                 temperature=0.7
             )
             
-            return response.choices[0].message.content
-            
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error generating CV: {e}")
             raise Exception(f"Failed to generate CV: {str(e)}")
@@ -93,105 +514,23 @@ class AIService:
             Structured CV data as a dictionary
         """
         try:
-            prompt = f"""
-            Extract structured data from the following CV text and format it as JSON.
-            The job description is provided for context to help identify relevant information.
-            
-            Job Description:
-            {job_description}
-            
-            CV Text:
-            {cv_text}
-            
-            Please extract and return the following information in JSON format:
-            {{
-                "personal": {{
-                    "name": "Full name",
-                    "email": "email@example.com",
-                    "phone": "phone number",
-                    "location": "city, country",
-                    "website": "website URL or empty string",
-                    "linkedin": "LinkedIn URL or empty string",
-                    "github": "GitHub URL or empty string"
-                }},
-                "professional_summary": "Brief professional summary",
-                "experience": [
-                    {{
-                        "role": "Job title",
-                        "company": "Company name",
-                        "startDate": "Start date (e.g., 'Jan 2023', '2023', 'Present')",
-                        "endDate": "End date (e.g., 'Dec 2023', 'Present', 'Current')",
-                        "location": "Job location",
-                        "description": "Job description",
-                        "achievements": ["achievement 1", "achievement 2"]
-                    }}
-                ],
-                "education": [
-                    {{
-                        "degree": "Degree name",
-                        "institution": "Institution name",
-                        "field": "Field of study",
-                        "startDate": "Start date (e.g., 'Sep 2020', '2020')",
-                        "endDate": "End date (e.g., 'May 2023', '2023', 'Present')",
-                        "gpa": "GPA if mentioned or empty string"
-                    }}
-                ],
-                "projects": [
-                    {{
-                        "name": "Project name",
-                        "description": "Project description",
-                        "tech_stack": ["technology1", "technology2"],
-                        "link": "Project URL or empty string",
-                        "startDate": "Start date if available or null",
-                        "endDate": "End date if available or null"
-                    }}
-                ],
-                "skills": {{
-                    "technical": ["skill1", "skill2"],
-                    "soft": ["skill1", "skill2"],
-                    "languages": ["language1", "language2"]
-                }},
-                "licenses_certifications": [
-                    {{
-                        "name": "Certification name",
-                        "issuer": "Issuing organization",
-                        "date": "Issue date (e.g., 'Jan 2023', '2023')",
-                        "expiry": "Expiry date if applicable or null"
-                    }}
-                ]
-            }}
-            
-            Important date formatting guidelines:
-            - Use "Present" or "Current" for ongoing positions/education
-            - Use formats like "Jan 2023", "2023", "Sep 2020 - May 2023"
-            - If only year is available, use just the year (e.g., "2023")
-            - If month and year are available, use "Jan 2023" format
-            
-            Return only the JSON object, no additional text.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert at extracting structured data from CVs. Always return valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
+            # JSON mode guarantees a bare JSON object (no markdown fences)
+            content = await self._chat(
+                _EXTRACT_CV_PROMPT.substitute(
+                    job_description=_fit_job_description(job_description),
+                    cv_text=_truncate_tokens(cv_text, settings.EXTRACTION_CV_MAX_TOKENS)
+                ),
+                system=_CV_EXTRACTION_INSTRUCTIONS,
+                model="gpt-4o-mini",
                 max_tokens=2000,
-                temperature=0.3
+                temperature=0,
+                response_format={"type": "json_object"}
             )
             
-            # Parse the JSON response
-            import json
-            content = response.choices[0].message.content.strip()
-            
-            # Remove any markdown formatting if present
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.endswith("```"):
-                content = content[:-3]
-            
-            return json.loads(content)
+            return orjson.loads(content)
             
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error extracting structured CV data: {e}")
             raise Exception(f"Failed to extract CV data: {str(e)}")
@@ -208,88 +547,84 @@ class AIService:
             Generated CV content
         """
         try:
-            prompt = f"""
-            Based on the following existing CV content and job description, generate an improved, tailored CV:
-            
-            Existing CV Content:
-            {file_content}
-            
-            Job Description:
-            {job_description}
-            
-            Please improve and tailor the CV to better match the job requirements.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a professional CV writer. Improve and tailor existing CVs based on job descriptions."},
-                    {"role": "user", "content": prompt}
-                ],
+            return await self._chat(
+                _GENERATE_CV_FROM_FILE_PROMPT.substitute(
+                    file_content=_fit_cv(file_content),
+                    job_description=_fit_job_description(job_description)
+                ),
+                system="You are a professional CV writer. Improve and tailor existing CVs based on job descriptions.",
                 max_tokens=2000,
                 temperature=0.7
             )
             
-            return response.choices[0].message.content
-            
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error generating CV from file: {e}")
             raise Exception(f"Failed to generate CV from file: {str(e)}")
     
-    async def transcribe_audio(self, audio_file_path: str) -> str:
+    async def transcribe_audio(self, audio_file: BinaryIO, filename: str) -> str:
         """
         Transcribe audio file to text.
         
         Args:
-            audio_file_path: Path to the audio file
+            audio_file: Binary file-like object positioned at the start of the audio
+            filename: File name sent to the API (its extension identifies the format)
             
         Returns:
             Transcribed text
         """
         try:
-            with open(audio_file_path, "rb") as audio_file:
-                transcript = self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file
-                )
-                return transcript.text
-                
+            transcript = await self._call_openai(
+                self.client.audio.transcriptions.create,
+                model="whisper-1",
+                file=(filename, audio_file)
+            )
+            return transcript.text
+            
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error transcribing audio: {e}")
             raise Exception(f"Failed to transcribe audio: {str(e)}")
     
-    async def analyze_job_description_image(self, image_file_path: str) -> str:
+    async def analyze_job_description_image(self, image: bytes, mime_type: str = "image/jpeg") -> str:
         """
         Extract job description from image using vision model.
         
         Args:
-            image_file_path: Path to the image file
+            image: Raw image bytes
+            mime_type: MIME type of the image
             
         Returns:
             Extracted job description text
         """
         try:
-            with open(image_file_path, "rb") as image_file:
-                response = self.client.chat.completions.create(
-                    model="gpt-4-vision-preview",
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {"type": "text", "text": "Extract the job description from this image. Return only the text content."},
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/jpeg;base64,{image_file.read().encode('base64')}"
-                                    }
+            # Base64-encode once, at the SDK boundary
+            image_b64 = base64.b64encode(image).decode("ascii")
+            response = await self._call_openai(
+                self.client.chat.completions.create,
+                model="gpt-4o",
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": "Extract the job description from this image. Return only the text content."},
+                            {
+                                "type": "image_url",
+                                "image_url": {
+                                    "url": f"data:{mime_type};base64,{image_b64}"
                                 }
-                            ]
-                        }
-                    ],
-                    max_tokens=1000
-                )
-                return response.choices[0].message.content
-                
+                            }
+                        ]
+                    }
+                ],
+                max_tokens=1000
+            )
+            return response.choices[0].message.content
+            
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error analyzing image: {e}")
             raise Exception(f"Failed to analyze image: {str(e)}")
@@ -306,120 +641,322 @@ class AIService:
             Evaluation results from multiple personas
         """
         try:
-            personas = [
-                {
-                    "name": "Technical Recruiter",
-                    "prompt": "You are a technical recruiter. Evaluate this CV for technical skills and experience relevant to the job."
-                },
-                {
-                    "name": "HR Manager", 
-                    "prompt": "You are an HR manager. Evaluate this CV for cultural fit, communication skills, and overall presentation."
-                },
-                {
-                    "name": "Hiring Manager",
-                    "prompt": "You are a hiring manager. Evaluate this CV for role-specific qualifications and potential for success."
-                }
-            ]
-            
-            evaluations = {}
-            
-            for persona in personas:
-                prompt = f"""
-                {persona['prompt']}
-                
-                Job Description:
-                {job_description}
-                
-                CV Content:
-                {cv_content}
-                
-                Please provide:
-                1. Overall score (1-10)
-                2. Strengths
-                3. Areas for improvement
-                4. Recommendation (Hire/Maybe/No)
-                """
-                
-                response = self.client.chat.completions.create(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": persona['prompt']},
-                        {"role": "user", "content": prompt}
-                    ],
+            job_description = _fit_job_description(job_description)
+            cv_content = _fit_cv(cv_content)
+            
+            # Independent calls: total latency is the slowest persona, not the sum
+            replies = await asyncio.gather(*[
+                self._chat(
+                    _COMMITTEE_PROMPT.substitute(role=role, job_description=job_description, cv_content=cv_content),
+                    system=role,
                     max_tokens=500,
                     temperature=0.7
                 )
-                
-                evaluations[persona['name']] = response.choices[0].message.content
+                for _, role in _COMMITTEE_PERSONAS
+            ])
+            
+            evaluations = {
+                name: reply
+                for (name, _), reply in zip(_COMMITTEE_PERSONAS, replies)
+            }
             
             return evaluations
             
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error evaluating CV: {e}")
             raise Exception(f"Failed to evaluate CV: {str(e)}")
 
-    async def rephrase_cv_section(self, section_content: str, section_type: str, job_description: str) -> str:
+    async def summarize_cv(self, cv_content: str) -> str:
         """
-        Rephrase a specific CV section to better fit the target job.
+        Condense a CV into a short structured summary for committee prompts.
+        
+        Deterministic, so repeated summaries of the same CV come from the
+        reply cache.
         
         Args:
-            section_content: The content of the CV section to rephrase
-            section_type: The type of section (e.g., 'professional_summary', 'experience', 'project')
-            job_description: The job description to tailor the content for
+            cv_content: The CV content to summarize
             
         Returns:
-            Rephrased section content
+            Bullet-point summary (about 500 tokens at most)
         """
-        try:
-            # Define section-specific prompts
-            section_prompts = {
-                'professional_summary': "You are a professional CV writer. Rephrase this professional summary to better align with the target job requirements while maintaining authenticity.",
-                'experience': "You are a professional CV writer. Rephrase this work experience description to better highlight relevant skills and achievements for the target job.",
-                'project': "You are a professional CV writer. Rephrase this project description to better showcase relevant technical skills and impact for the target job.",
-                'education': "You are a professional CV writer. Rephrase this education section to better emphasize relevant coursework, achievements, or projects for the target job.",
-                'skills': "You are a professional CV writer. Rephrase and reorganize these skills to better match the target job requirements and highlight the most relevant ones first.",
-                'certification': "You are a professional CV writer. Rephrase this certification description to better emphasize its relevance to the target job."
-            }
+        summary = await self._chat(
+            _CV_SUMMARY_PROMPT.substitute(cv_content=_truncate_tokens(cv_content, settings.EXTRACTION_CV_MAX_TOKENS)),
+            model="gpt-4o-mini",
+            max_tokens=500,
+            temperature=0
+        )
+        print_step("CV Summary", lambda: {
+            "cv_content_length": len(cv_content),
+            "summary_length": len(summary)
+        }, "output")
+        return summary
+    
+    async def evaluate_with_persona(self, persona: str, job_description: str, cv_content: str) -> Dict[str, Any]:
+        """
+        Score a CV against a job description from one committee persona's perspective.
+        
+        Args:
+            persona: Persona to act as (e.g. 'Strict Hiring Manager')
+            job_description: The job description to evaluate against
+            cv_content: The CV content to evaluate
             
-            base_prompt = section_prompts.get(section_type, "You are a professional CV writer. Rephrase this CV section to better align with the target job requirements.")
+        Returns:
+            Dictionary with 'persona', 'score' and 'justification'
+        """
+        print_step("Persona Evaluation", lambda: {
+            "persona": persona,
+            "job_description_length": len(job_description),
+            "cv_content_length": len(cv_content)
+        }, "input")
+        
+        content = await self._chat(
+            _persona_prompt(persona, job_description, cv_content),
+            system=_PERSONA_SYSTEM,
+            model=_PERSONA_MODEL,
+            temperature=0.0,
+            response_format={"type": "json_object"}
+        )
+        
+        result = orjson.loads(content)
+        print_step("Persona Evaluation", result, "output")
+        return result
+    
+    async def evaluate_with_personas(self, personas: List[str], job_description: str, cv_content: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Score a CV from several committee personas' perspectives in one request.
+        
+        Args:
+            personas: Personas to act as
+            job_description: The job description to evaluate against
+            cv_content: The CV content to evaluate
             
-            prompt = f"""
-            {base_prompt}
+        Returns:
+            Evaluations ('persona', 'score', 'justification') keyed by persona;
+            personas the reply omitted are missing
+        """
+        print_step("Panel Evaluation", lambda: {
+            "personas": personas,
+            "job_description_length": len(job_description),
+            "cv_content_length": len(cv_content)
+        }, "input")
+        
+        content = await self._chat(
+            _PANEL_PROMPT.substitute(
+                personas=", ".join(f'"{persona}"' for persona in personas),
+                job_description=_fit_job_description(job_description),
+                cv_content=_fit_cv(cv_content)
+            ),
+            model=_PERSONA_MODEL,
+            max_tokens=300 * len(personas),
+            temperature=0.0,
+            response_format=_PANEL_RESPONSE_FORMAT
+        )
+        
+        wanted = set(personas)
+        results = {
+            evaluation["persona"]: evaluation
+            for evaluation in orjson.loads(content)["evaluations"]
+            if evaluation["persona"] in wanted
+        }
+        print_step("Panel Evaluation", lambda: results, "output")
+        return results
+    
+    async def submit_persona_batch(self, personas: List[str], job_description: str, cv_content: str) -> str:
+        """
+        Queue persona evaluations on the OpenAI Batch API (24h window, half price).
+        
+        Args:
+            personas: Personas to act as, one batch request each
+            job_description: The job description to evaluate against
+            cv_content: The CV content to evaluate
             
-            Job Description:
-            {job_description}
+        Returns:
+            The batch ID, for get_persona_batch
+        """
+        try:
+            lines = [
+                orjson.dumps({
+                    "custom_id": f"persona-{persona}",
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": _PERSONA_MODEL,
+                        "messages": [
+                            {"role": "system", "content": _PERSONA_SYSTEM},
+                            {"role": "user", "content": _persona_prompt(persona, job_description, cv_content)}
+                        ],
+                        "temperature": 0.0,
+                        "response_format": {"type": "json_object"}
+                    }
+                })
+                for persona in personas
+            ]
             
-            Current {section_type.replace('_', ' ').title()} Content:
-            {section_content}
+            input_file = await self._call_openai(
+                self.client.files.create,
+                file=("committee-evaluation.jsonl", b"\n".join(lines)),
+                purpose="batch"
+            )
+            batch = await self._call_openai(
+                self.client.batches.create,
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
             
-            Instructions:
-            1. Rephrase the content to better match the job requirements
-            2. Use action verbs and quantifiable achievements where possible
-            3. Highlight relevant technical skills and technologies mentioned in the job description
-            4. Maintain professional tone and authenticity
-            5. Keep the same length or slightly shorter
-            6. Focus on impact and results rather than just responsibilities
-            7. Use keywords from the job description naturally
+            print_step("Persona Batch Submitted", lambda: {
+                "batch_id": batch.id,
+                "personas": personas
+            }, "output")
+            return batch.id
             
-            Return only the rephrased content, no additional text or explanations.
-            """
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Error submitting evaluation batch: {e}")
+            raise Exception(f"Failed to submit evaluation batch: {str(e)}")
+    
+    async def get_persona_batch(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Fetch the state of a batch queued by submit_persona_batch.
+        
+        Args:
+            batch_id: ID returned by submit_persona_batch
             
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": base_prompt},
-                    {"role": "user", "content": prompt}
-                ],
+        Returns:
+            Dictionary with the batch 'status' and, once completed, 'results':
+            the parsed evaluations of the personas that succeeded
+        """
+        try:
+            batch = await self._call_openai(self.client.batches.retrieve, batch_id=batch_id)
+            if batch.status != "completed":
+                return {"status": batch.status, "results": None}
+            
+            results = []
+            if batch.output_file_id:
+                output = await self._call_openai(self.client.files.content, file_id=batch.output_file_id)
+                for line in output.text.splitlines():
+                    if not line.strip():
+                        continue
+                    record = orjson.loads(line)
+                    response = record.get("response") or {}
+                    if response.get("status_code") != 200:
+                        print_step("Persona Batch Error", lambda: {
+                            "custom_id": record.get("custom_id"),
+                            "error": record.get("error") or response.get("body")
+                        }, "error")
+                        continue
+                    content = response["body"]["choices"][0]["message"]["content"]
+                    try:
+                        results.append(orjson.loads(content))
+                    except orjson.JSONDecodeError as e:
+                        print_step("Persona Batch Error", lambda: {"custom_id": record.get("custom_id"), "error": str(e)}, "error")
+            
+            return {"status": batch.status, "results": results}
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Error retrieving evaluation batch: {e}")
+            raise Exception(f"Failed to retrieve evaluation batch: {str(e)}")
+    
+    async def rephrase_cv_section(self, section_content: str, section_type: str, job_description: str) -> str:
+        """
+        Rephrase a specific CV section to better fit the target job.
+        
+        Args:
+            section_content: The content of the CV section to rephrase
+            section_type: The type of section (e.g., 'professional_summary', 'experience', 'project')
+            job_description: The job description to tailor the content for
+            
+        Returns:
+            Rephrased section content
+        """
+        try:
+            base_prompt = _SECTION_PROMPTS.get(section_type, _DEFAULT_SECTION_PROMPT)
+            
+            content = await self._chat(
+                _REPHRASE_PROMPT.substitute(
+                    role=base_prompt,
+                    job_description=_fit_job_description(job_description),
+                    section_label=section_type.replace('_', ' ').title(),
+                    section_content=section_content
+                ),
+                system=base_prompt,
                 max_tokens=800,
                 temperature=0.7
             )
             
-            return response.choices[0].message.content.strip()
+            return content.strip()
             
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error rephrasing CV section: {e}")
             raise Exception(f"Failed to rephrase CV section: {str(e)}")
-
-
-# Global instance
-ai_service = AIService()
+    
+    async def rephrase_cv_sections(self, sections: List[Dict[str, str]], job_description: str) -> List[str]:
+        """
+        Rephrase several CV sections for the same job in a single request.
+        
+        Sections the model leaves out of its reply are rephrased one by one.
+        
+        Args:
+            sections: Dicts with 'section_type' and 'section_content'
+            job_description: The job description to tailor the content for
+            
+        Returns:
+            Rephrased content, in the same order as sections
+        """
+        if len(sections) == 1:
+            only = sections[0]
+            return [await self.rephrase_cv_section(only["section_content"], only["section_type"], job_description)]
+        
+        try:
+            items = [
+                {
+                    "id": i,
+                    "section_type": section["section_type"],
+                    "role": _SECTION_PROMPTS.get(section["section_type"], _DEFAULT_SECTION_PROMPT),
+                    "content": section["section_content"]
+                }
+                for i, section in enumerate(sections)
+            ]
+            # gpt-4 has no JSON mode, so the batch call uses gpt-4o
+            content = await self._chat(
+                _REPHRASE_BATCH_PROMPT.substitute(
+                    job_description=_fit_job_description(job_description),
+                    sections=orjson.dumps(items).decode()
+                ),
+                system="You are a professional CV writer. Always return valid JSON.",
+                model="gpt-4o",
+                max_tokens=min(800 * len(sections), 4000),
+                temperature=0.7,
+                response_format={"type": "json_object"}
+            )
+            
+            rephrased: Dict[int, str] = {}
+            for entry in orjson.loads(content).get("sections", []):
+                if isinstance(entry, dict) and isinstance(entry.get("rephrased"), str):
+                    rephrased[entry.get("id")] = entry["rephrased"].strip()
+            
+            missing = [i for i in range(len(sections)) if i not in rephrased]
+            if missing:
+                print_step("Batch Rephrase", lambda: {"missing_sections": missing}, "error")
+                fallbacks = await asyncio.gather(*[
+                    self.rephrase_cv_section(
+                        sections[i]["section_content"], sections[i]["section_type"], job_description
+                    )
+                    for i in missing
+                ])
+                rephrased.update(zip(missing, fallbacks))
+            
+            return [rephrased[i] for i in range(len(sections))]
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Error rephrasing CV sections: {e}")
+            raise Exception(f"Failed to rephrase CV sections: {str(e)}")
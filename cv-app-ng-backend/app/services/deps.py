@@ -0,0 +1,46 @@
+"""
+Shared, lazily created service instances.
+
+Every router uses these factories, so the application holds a single
+OpenAI client (and connection pool) per process. Services are created on
+first use so importing a router (e.g. on a Lambda cold start serving an
+unrelated route) does not pay their init cost.
+"""
+from functools import lru_cache
+
+@lru_cache(maxsize=1)
+def get_ai_service():
+    """Return the shared AI service, creating it on first call."""
+    from .ai_service import AIService
+    return AIService()
+
+@lru_cache(maxsize=1)
+def get_vectorstore_service():
+    """Return the shared vectorstore service, creating it on first call."""
+    from .vectorstore_service import VectorstoreService
+    return VectorstoreService()
+
+@lru_cache(maxsize=1)
+def get_evaluation_service():
+    """Return the shared evaluation service, creating it on first call."""
+    from .evaluation_service import EvaluationService
+    return EvaluationService(get_ai_service())
+
+@lru_cache(maxsize=1)
+def get_pdf_service():
+    """Return the shared PDF service, creating it on first call."""
+    from .pdf_service import PDFService
+    return PDFService()
+
+@lru_cache(maxsize=1)
+def get_data_transformation_service():
+    """Return the shared data transformation service, creating it on first call."""
+    from .data_transformation_service import DataTransformationService
+    return DataTransformationService()
+
+async def close_services() -> None:
+    """Release connections held by services that have been created."""
+    if get_ai_service.cache_info().currsize:
+        await get_ai_service().aclose()
+        get_evaluation_service.cache_clear()
+        get_ai_service.cache_clear()
@@ -0,0 +1,123 @@
+"""
+In-process cache for text embeddings.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, List
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from ..utils.debug import print_step
+
+class EmbeddingCache:
+    """
+    LRU cache of embeddings keyed by a BLAKE2b digest of the model name and text.
+
+    Repeated CV chunks and job descriptions (e.g. re-tailoring the same CV)
+    skip the embedding API entirely. Safe to share between worker threads.
+    Vectors may be stored as float16 to halve memory; lookups always return
+    float32.
+    """
+
+    def __init__(self, model: str, max_entries: int = 2048, dtype: str = "float32"):
+        """
+        Initialize the cache.
+
+        Args:
+            model: Embedding model name, included in every key
+            max_entries: Maximum number of cached vectors (LRU eviction)
+            dtype: Storage dtype for cached vectors ("float32" or "float16")
+        """
+        self.model = model
+        self.max_entries = max_entries
+        self.dtype = np.dtype(dtype)
+        self._vectors: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, text: str) -> bytes:
+        """Return the cache key for a text (a 128-bit digest; BLAKE2b beats SHA-256 on short texts)."""
+        return hashlib.blake2b(f"{self.model}::{text}".encode("utf-8"), digest_size=16).digest()
+
+    def embed_many(self, texts: List[str], embed_fn: Callable[[List[str]], List[List[float]]]) -> np.ndarray:
+        """
+        Embed texts, calling embed_fn once for the uncached ones only.
+
+        Args:
+            texts: Texts to embed
+            embed_fn: Batch embedding function (e.g. embed_documents)
+
+        Returns:
+            New float32 array with one row per text
+        """
+        keys = [self._key(text) for text in texts]
+        vectors = [None] * len(texts)
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._vectors.get(key)
+                if vector is not None:
+                    self._vectors.move_to_end(key)
+                    vectors[i] = vector
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        print_step("Embedding Cache", lambda: {
+            "requested": len(texts),
+            "cached": len(texts) - len(missing)
+        }, "info")
+
+        if missing:
+            # Texts repeated within the batch are sent once
+            pending = {keys[i]: texts[i] for i in missing}
+            fresh = np.asarray(embed_fn(list(pending.values())), dtype=self.dtype)
+            # Cached rows are shared between callers, so guard against in-place edits
+            fresh.setflags(write=False)
+            rows = dict(zip(pending, fresh))
+            with self._lock:
+                self._vectors.update(rows)
+                for i in missing:
+                    vectors[i] = rows[keys[i]]
+                while len(self._vectors) > self.max_entries:
+                    self._vectors.popitem(last=False)
+
+        if not vectors:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack(vectors).astype(np.float32, copy=False)
+
+    def embed_one(self, text: str, embed_fn: Callable[[str], List[float]]) -> np.ndarray:
+        """
+        Embed a single text (e.g. a query), using the cache.
+
+        Args:
+            text: Text to embed
+            embed_fn: Single-text embedding function (e.g. embed_query)
+
+        Returns:
+            float32 vector
+        """
+        return self.embed_many([text], lambda batch: [embed_fn(batch[0])])[0]
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain embeddings adapter that serves vectors through an EmbeddingCache.
+
+    Lets vectorstores batch-embed through the cache: add_texts sends only
+    uncached chunks to the API, in one embed_documents call.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache):
+        """
+        Initialize the adapter.
+
+        Args:
+            embeddings: Underlying embeddings model
+            cache: Cache keyed by the same model name
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, calling the model for uncached ones only."""
+        return self.cache.embed_many(texts, self.embeddings.embed_documents).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, using the cache."""
+        return self.cache.embed_one(text, self.embeddings.embed_query).tolist()
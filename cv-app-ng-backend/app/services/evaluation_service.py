@@ -2,36 +2,49 @@
 Evaluation service for CV assessment.
 """
 import asyncio
-import numpy as np
-from typing import Dict, Any, List
+import math
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+import orjson
+from fastapi import HTTPException
+from typing import Dict, Any, List, Optional
+from langchain_core.embeddings import Embeddings
 from ..core.config import settings
 from ..utils.debug import print_step
 
-# Conditional imports for ragas
-try:
-    from ragas import evaluate
-    from ragas.metrics import faithfulness, answer_relevancy, context_precision, context_recall
-    from datasets import Dataset
-    RAGAS_AVAILABLE = True
-    print("INFO: Ragas evaluation framework loaded successfully.")
-except ImportError as e:
-    print(f"WARNING: Ragas not available: {e}")
-    RAGAS_AVAILABLE = False
-    # Create dummy functions to prevent errors
-    def evaluate(*args, **kwargs):
-        return None
-    def faithfulness(*args, **kwargs):
-        return None
-    def answer_relevancy(*args, **kwargs):
-        return None
-    def context_precision(*args, **kwargs):
-        return None
-    def context_recall(*args, **kwargs):
+@lru_cache(maxsize=1)
+def _load_ragas() -> Optional[Dict[str, Any]]:
+    """
+    Import RAGAS and datasets on first use.
+    
+    Together they take seconds to import, which would otherwise land on
+    every cold start, including ones that never evaluate a CV.
+    
+    Returns:
+        The evaluate function, metrics and Dataset class, or None if RAGAS
+        is not installed
+    """
+    try:
+        from ragas import evaluate
+        from ragas.metrics import faithfulness, answer_relevancy, context_precision, context_recall
+        from datasets import Dataset
+    except ImportError as e:
+        print(f"WARNING: Ragas not available: {e}")
         return None
-    class Dataset:
-        @staticmethod
-        def from_dict(data):
-            return None
+    print("INFO: Ragas evaluation framework loaded successfully.")
+    return {
+        "evaluate": evaluate,
+        "metrics": [faithfulness, answer_relevancy, context_precision, context_recall],
+        "Dataset": Dataset,
+    }
+
+@lru_cache(maxsize=1)
+def _ragas_executor() -> ThreadPoolExecutor:
+    """Return the dedicated RAGAS thread pool, creating it on first call."""
+    return ThreadPoolExecutor(max_workers=settings.RAGAS_MAX_WORKERS, thread_name_prefix="ragas")
+
+# Retrieved context shorter than this gives RAGAS nothing meaningful to score
+_RAGAS_MIN_CONTEXT_CHARS = 200
 
 class EvaluationService:
     """Service for CV evaluation operations."""
@@ -45,23 +58,30 @@ class EvaluationService:
         """
         self.ai_service = ai_service
     
-    async def evaluate_cv_with_ragas(self, job_description: str, cv_content: str, retrieved_docs: List) -> Dict[str, float]:
+    async def evaluate_cv_with_ragas(self, job_description: str, cv_content: str, contexts: List[str],
+                                     embeddings: Optional[Embeddings] = None) -> Dict[str, float]:
         """
         Evaluate CV using RAGAS metrics.
         
         Args:
             job_description: Job description
             cv_content: CV content as JSON string
-            retrieved_docs: Retrieved documents from vectorstore
+            contexts: Page content of the documents retrieved from the vectorstore
+            embeddings: Embeddings for the metrics (optional, RAGAS's default
+                OpenAI embeddings otherwise); pass the cached ones so texts
+                already embedded for retrieval, like the job description,
+                skip the API
             
         Returns:
             RAGAS evaluation scores
         """
-        print_step("RAGAS Evaluation Setup", {
-            "ragas_available": RAGAS_AVAILABLE
+        # First call imports RAGAS; do it off the event loop
+        ragas = await asyncio.get_running_loop().run_in_executor(_ragas_executor(), _load_ragas)
+        print_step("RAGAS Evaluation Setup", lambda: {
+            "ragas_available": ragas is not None
         }, "input")
         
-        if not RAGAS_AVAILABLE:
+        if ragas is None:
             print_step("RAGAS Evaluation", 
                       "RAGAS not available, using default scores", "info")
             return {
@@ -72,16 +92,17 @@ class EvaluationService:
             }
         
         try:
-            print_step("RAGAS Dataset Creation", {
+            print_step("RAGAS Dataset Creation", lambda: {
                 "question_length": len(job_description),
-                "contexts_count": len(retrieved_docs),
+                "contexts_count": len(contexts),
                 "answer_length": len(cv_content)
             }, "input")
             
-            # Validate that we have contexts to evaluate
-            if not retrieved_docs:
+            # Validate that we have contexts to evaluate; each RAGAS metric
+            # makes its own LLM calls, so skip it when there is too little
+            if sum(map(len, contexts)) < _RAGAS_MIN_CONTEXT_CHARS:
                 print_step("RAGAS Dataset Creation", 
-                          "No retrieved documents - skipping RAGAS evaluation", "error")
+                          "Too little retrieved context - skipping RAGAS evaluation", "error")
                 return {
                     "faithfulness": 0.0,
                     "answer_relevancy": 0.0,
@@ -92,30 +113,36 @@ class EvaluationService:
             # Create a proper reference answer for context_precision metric
             reference_answer = f"Based on the job description: {job_description}, the CV should highlight relevant skills and experience."
             
-            dataset = Dataset.from_dict({
+            dataset = ragas["Dataset"].from_dict({
                 'question': [job_description],
-                'contexts': [doc.page_content for doc in retrieved_docs],
+                'contexts': contexts,
                 'answer': [cv_content],
                 'ground_truths': [reference_answer]
             })
             print_step("RAGAS Dataset Creation", "Dataset created successfully", "output")
             
-            print_step("RAGAS Evaluation Execution", {
+            print_step("RAGAS Evaluation Execution", lambda: {
                 "metrics": ["faithfulness", "answer_relevancy", "context_precision", "context_recall"]
             }, "input")
             
-            ragas_result = await asyncio.to_thread(
-                evaluate, 
-                dataset, 
-                metrics=[faithfulness, answer_relevancy, context_precision, context_recall]
+            ragas_result = await asyncio.get_running_loop().run_in_executor(
+                _ragas_executor(),
+                partial(
+                    ragas["evaluate"],
+                    dataset,
+                    metrics=ragas["metrics"],
+                    embeddings=embeddings
+                )
             )
-            ragas_scores = ragas_result.to_pandas().to_dict('records')[0]
+            # Per-row metric scores, read directly instead of through a DataFrame
+            ragas_scores = dict(ragas_result.scores[0])
             print_step("RAGAS Evaluation Execution", "Evaluation completed", "output")
             
             # Handle NaN values in RAGAS scores
             print_step("RAGAS Score Processing", ragas_scores, "input")
+            # A handful of scalars: math beats numpy's array setup and ufunc dispatch
             for key, value in ragas_scores.items():
-                if isinstance(value, float) and (np.isnan(value) or np.isinf(value)):
+                if isinstance(value, float) and not math.isfinite(value):
                     ragas_scores[key] = 0.0
             print_step("RAGAS Score Processing", "NaN values handled", "output")
             
@@ -130,6 +157,28 @@ class EvaluationService:
                 "context_recall": 0.0
             }
     
+    async def _committee_cv_content(self, cv_content: str) -> str:
+        """
+        Return the CV text the personas score: a shared summary for long CVs.
+        
+        Summarizing once means a long CV is sent in full to one cheap call
+        instead of to every persona. Falls back to the full CV on failure.
+        
+        Args:
+            cv_content: CV content as JSON string
+            
+        Returns:
+            The summary, or cv_content if it is short or summarizing fails
+        """
+        min_chars = settings.COMMITTEE_SUMMARY_MIN_CHARS
+        if not min_chars or len(cv_content) <= min_chars:
+            return cv_content
+        try:
+            return await self.ai_service.summarize_cv(cv_content)
+        except Exception as e:
+            print_step("CV Summary Error", str(e), "error")
+            return cv_content
+    
     async def evaluate_cv_with_committee(self, job_description: str, cv_content: str) -> Dict[str, Any]:
         """
         Evaluate CV using committee of personas.
@@ -141,62 +190,146 @@ class EvaluationService:
         Returns:
             Committee evaluation results
         """
-        print_step("Committee Evaluation Setup", {
+        print_step("Committee Evaluation Setup", lambda: {
             "personas": settings.EVALUATION_PERSONAS,
             "cv_content_length": len(cv_content)
         }, "input")
         
-        evaluation_tasks = [
-            self.ai_service.evaluate_with_persona(p, job_description, cv_content)
-            for p in settings.EVALUATION_PERSONAS
-        ]
+        personas = settings.EVALUATION_PERSONAS
+        persona_cv_content = await self._committee_cv_content(cv_content)
         
-        print_step("Committee Evaluation Execution", {
-            "task_count": len(evaluation_tasks)
+        # All personas share one request; any it fails to cover are scored
+        # by separate per-persona calls below
+        try:
+            evaluations = await self.ai_service.evaluate_with_personas(
+                list(personas), job_description, persona_cv_content
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            print_step("Panel Evaluation Error", str(e), "error")
+            evaluations = {}
+        
+        missing = [p for p in personas if p not in evaluations]
+        print_step("Committee Evaluation Execution", lambda: {
+            "panel_evaluations": len(evaluations),
+            "fallback_task_count": len(missing)
         }, "input")
         
-        committee_evaluations = await asyncio.gather(*evaluation_tasks)
-        print_step("Committee Evaluation Execution", {
-            "completed_evaluations": len(committee_evaluations)
+        # One persona failing (timeout, bad JSON) must not sink the others
+        results = await asyncio.gather(*[
+            self.ai_service.evaluate_with_persona(p, job_description, persona_cv_content)
+            for p in missing
+        ], return_exceptions=True)
+        for persona, result in zip(missing, results):
+            if isinstance(result, BaseException):
+                print_step("Committee Evaluation Error", lambda: {"persona": persona, "error": str(result)}, "error")
+            else:
+                evaluations[persona] = result
+        if not evaluations and results:
+            raise results[0]
+        committee_evaluations = [evaluations[p] for p in personas if p in evaluations]
+        print_step("Committee Evaluation Execution", lambda: {
+            "completed_evaluations": len(committee_evaluations),
+            "failed_evaluations": len(personas) - len(committee_evaluations)
         }, "output")
         
+        return self._summarize_committee(committee_evaluations)
+    
+    def _summarize_committee(self, committee_evaluations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Combine persona evaluations into the committee analysis.
+        
+        Args:
+            committee_evaluations: Parsed persona evaluations
+            
+        Returns:
+            Committee evaluation results
+        """
         # Handle potential NaN values in committee scores
         print_step("Committee Score Processing", committee_evaluations, "input")
-        scores = []
-        for e in committee_evaluations:
-            score = e.get('score', 0)
-            if isinstance(score, (int, float)) and not (np.isnan(score) or np.isinf(score)):
-                scores.append(score)
-            else:
-                scores.append(0)
+        scores = [
+            float(score) if isinstance(score := e.get('score', 0), (int, float)) and math.isfinite(score) else 0.0
+            for e in committee_evaluations
+        ]
         
         committee_analysis = {
             "individual_evaluations": committee_evaluations,
-            "average_score": round(np.mean(scores), 2) if scores else 0.0
+            "average_score": round(sum(scores) / len(scores), 2) if scores else 0.0
         }
         print_step("Committee Score Processing", committee_analysis, "output")
         
         return committee_analysis
     
-    async def evaluate_cv_complete(self, job_description: str, cv_content: str, retrieved_docs: List) -> Dict[str, Any]:
+    async def submit_committee_evaluation(self, job_description: str, cv_content: str) -> str:
         """
-        Perform complete CV evaluation with both RAGAS and committee evaluation.
+        Queue a committee evaluation on the OpenAI Batch API.
+        
+        Batch requests cost half as much and do not use the real-time rate
+        limits, at the price of completing within 24 hours.
         
         Args:
             job_description: Job description
             cv_content: CV content as JSON string
+            
+        Returns:
+            Batch ID to pass to poll_committee_evaluation
+        """
+        return await self.ai_service.submit_persona_batch(
+            list(settings.EVALUATION_PERSONAS), job_description, await self._committee_cv_content(cv_content)
+        )
+    
+    async def poll_committee_evaluation(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Check a queued committee evaluation.
+        
+        Args:
+            batch_id: ID returned by submit_committee_evaluation
+            
+        Returns:
+            Dictionary with the batch 'status' and, once completed, the
+            'committee_evaluation' results
+        """
+        batch = await self.ai_service.get_persona_batch(batch_id)
+        if batch["results"] is None:
+            return {"status": batch["status"], "committee_evaluation": None}
+        return {
+            "status": batch["status"],
+            "committee_evaluation": self._summarize_committee(batch["results"])
+        }
+    
+    async def evaluate_cv_complete(self, job_description: str, cv_data: Dict[str, Any], retrieved_docs: List,
+                                   embeddings: Optional[Embeddings] = None) -> Dict[str, Any]:
+        """
+        Perform complete CV evaluation with both RAGAS and committee evaluation.
+        
+        Args:
+            job_description: Job description
+            cv_data: Structured CV content as a dictionary
             retrieved_docs: Retrieved documents from vectorstore
+            embeddings: Embeddings for the RAGAS metrics (optional)
             
         Returns:
             Complete evaluation results
         """
-        # Run RAGAS and committee evaluation in parallel
-        ragas_task = self.evaluate_cv_with_ragas(job_description, cv_content, retrieved_docs)
-        committee_task = self.evaluate_cv_with_committee(job_description, cv_content)
+        # Serialize once for the prompts shared by both evaluations
+        cv_content = orjson.dumps(cv_data).decode()
+        
+        contexts = [doc.page_content for doc in retrieved_docs]
         
-        ragas_scores, committee_analysis = await asyncio.gather(ragas_task, committee_task)
+        # Run RAGAS and committee evaluation in parallel; if one fails the
+        # task group cancels the other instead of leaving it running
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                ragas_task = task_group.create_task(self.evaluate_cv_with_ragas(job_description, cv_content, contexts, embeddings))
+                committee_task = task_group.create_task(self.evaluate_cv_with_committee(job_description, cv_content))
+        except ExceptionGroup as group:
+            # Re-raise the original error so callers still see e.g. the 429
+            # HTTPException from a full LLM queue
+            raise group.exceptions[0]
+        ragas_scores, committee_analysis = ragas_task.result(), committee_task.result()
         
-        print_step("Final Analysis Assembly", {
+        print_step("Final Analysis Assembly", lambda: {
             "ragas_scores": ragas_scores,
             "committee_analysis": committee_analysis
         }, "input")
@@ -0,0 +1,170 @@
+"""
+LLM response cache for repeated or near-duplicate prompts.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+import orjson
+from ..utils.debug import print_step
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Miss embeddings kept for a following set(); bounded so abandoned misses don't pile up
+_MAX_PENDING_VECTORS = 64
+
+class SemanticLLMCache:
+    """
+    Two-tier cache for LLM responses.
+
+    The exact tier keys on a SHA-256 of the whitespace-normalized prompt
+    inputs. The optional semantic tier embeds the inputs and returns a
+    cached response whose embedding has cosine similarity at or above the
+    threshold. Entries may be partitioned by a scope string: semantic
+    matches are only considered within the same scope. Values are stored as
+    JSON so every hit returns a fresh copy. Entries older than the TTL are
+    treated as misses, so prompt or model changes eventually take effect.
+    Safe to share between threads; embedding calls run outside the lock.
+    """
+
+    def __init__(self, max_entries: int = 512,
+                 embed_fn: Optional[Callable[[str], List[float]]] = None,
+                 threshold: float = 0.92,
+                 ttl_seconds: float = 0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached responses (LRU eviction)
+            embed_fn: Embedding function enabling the semantic tier (optional)
+            threshold: Minimum cosine similarity for a semantic hit
+            ttl_seconds: Lifetime of an entry; 0 keeps entries until evicted
+        """
+        self.max_entries = max_entries
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._expires: Dict[str, float] = {}
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._scopes: Dict[str, str] = {}
+        self._pending_vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def build_key_text(*parts: str) -> str:
+        """Join prompt inputs into one whitespace-normalized key text."""
+        return "\x1f".join(_WHITESPACE_RE.sub(" ", part).strip() for part in parts)
+
+    @staticmethod
+    def _hash(key_text: str, scope: str) -> str:
+        """Return the exact-match key for a key text within a scope."""
+        return hashlib.sha256(f"{scope}\x1e{key_text}".encode("utf-8")).hexdigest()
+
+    def _discard(self, key: str) -> None:
+        """Remove an entry from every tier (caller holds the lock)."""
+        self._entries.pop(key, None)
+        self._expires.pop(key, None)
+        self._vectors.pop(key, None)
+        self._scopes.pop(key, None)
+
+    def _is_expired(self, key: str, now: float) -> bool:
+        """Return whether an entry has outlived the TTL, discarding it if so (caller holds the lock)."""
+        expires = self._expires.get(key)
+        if expires is None or now < expires:
+            return False
+        self._discard(key)
+        return True
+
+    def _embed(self, key_text: str) -> np.ndarray:
+        """Embed a key text and L2-normalize it."""
+        vector = np.asarray(self.embed_fn(key_text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, key_text: str, scope: str = "") -> Optional[Any]:
+        """
+        Look up a cached response.
+
+        Args:
+            key_text: Key text from build_key_text
+            scope: Partition restricting semantic matches (optional)
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        key = self._hash(key_text, scope)
+        now = time.monotonic()
+        keys: List[str] = []
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None and not self._is_expired(key, now):
+                self._entries.move_to_end(key)
+            else:
+                payload = None
+                if self.embed_fn is not None:
+                    keys = [k for k in list(self._vectors) if self._scopes.get(k) == scope and not self._is_expired(k, now)]
+                    if keys:
+                        matrix = np.stack([self._vectors[k] for k in keys])
+        if payload is not None:
+            print_step("LLM Cache", "Exact cache hit", "info")
+            return orjson.loads(payload)
+        if not keys:
+            return None
+
+        # Network call: keep it outside the lock
+        query = self._embed(key_text)
+        with self._lock:
+            # Keep the miss's embedding so a following set() can reuse it
+            self._pending_vectors[key] = query
+            while len(self._pending_vectors) > _MAX_PENDING_VECTORS:
+                self._pending_vectors.popitem(last=False)
+
+        similarities = matrix @ query
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+
+        best_key = keys[best]
+        with self._lock:
+            # Another thread may have evicted or expired the match meanwhile
+            payload = self._entries.get(best_key)
+            if payload is None or self._is_expired(best_key, time.monotonic()):
+                return None
+            self._entries.move_to_end(best_key)
+        print_step("LLM Cache", {"semantic_hit_similarity": float(similarities[best])}, "info")
+        return orjson.loads(payload)
+
+    def set(self, key_text: str, value: Any, scope: str = "") -> None:
+        """
+        Store a response.
+
+        Args:
+            key_text: Key text from build_key_text
+            value: JSON-serializable response to cache
+            scope: Partition restricting semantic matches (optional)
+        """
+        key = self._hash(key_text, scope)
+        payload = orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+
+        vector = None
+        if self.embed_fn is not None:
+            with self._lock:
+                vector = self._pending_vectors.pop(key, None)
+            if vector is None:
+                vector = self._embed(key_text)
+
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            self._scopes[key] = scope
+            if self.ttl_seconds:
+                self._expires[key] = time.monotonic() + self.ttl_seconds
+            if vector is not None:
+                self._vectors[key] = vector
+
+            while len(self._entries) > self.max_entries:
+                evicted = next(iter(self._entries))
+                self._discard(evicted)
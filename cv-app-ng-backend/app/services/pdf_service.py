@@ -1,20 +1,179 @@
 """
 PDF generation service using WeasyPrint and Jinja2.
 """
+import asyncio
+import hashlib
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
 import jinja2
 from weasyprint import HTML
+from weasyprint.text.fonts import FontConfiguration
 from fastapi.responses import Response
 from ..core.config import settings
 from ..utils.debug import print_step
+from ..utils.security import sanitize_filename
 from ..models.cv_models import PDFRequest
 
+@lru_cache(maxsize=1)
+def _list_templates(templates_dir: str, mtime_ns: int) -> Tuple[str, ...]:
+    """
+    List template names in a directory.
+    
+    Cached per directory modification time, so adding or removing a
+    template invalidates the cached list.
+    """
+    return tuple(sorted(
+        file[:-5] for file in os.listdir(templates_dir) if file.endswith('.html')
+    ))
+
+# Per-thread font configuration: Fontconfig state is neither fork- nor thread-safe
+_font_state = threading.local()
+
+def _font_config() -> FontConfiguration:
+    """
+    Return this thread's WeasyPrint font configuration, creating it on first use.
+    
+    WeasyPrint otherwise builds one per render, reloading the system fonts
+    and re-downloading the templates' @font-face files every time; a kept
+    configuration reuses the downloaded files.
+    """
+    pid = os.getpid()
+    if getattr(_font_state, "pid", None) != pid:
+        _font_state.config = FontConfiguration()
+        _font_state.pid = pid
+    return _font_state.config
+
+def _render_pdf(html_content: str) -> bytes:
+    """Render HTML to PDF bytes (top-level so it can run in a worker process)."""
+    return HTML(string=html_content).write_pdf(font_config=_font_config())
+
+def _warm_renderer() -> None:
+    """
+    Render a trivial page so a new worker process loads fonts before its first PDF.
+    
+    Errors (e.g. missing fonts or Pango) are reported rather than raised:
+    a raising pool initializer breaks the whole pool.
+    """
+    try:
+        _render_pdf("<p>warm</p>")
+    except Exception as e:
+        # Plain print: forked workers do not run the debug log writer thread
+        print(f"WARNING: PDF renderer warm-up failed in process {os.getpid()}: {e}")
+
+# Set once the pool breaks; rendering then stays on threads for the process lifetime
+_pdf_pool_broken = False
+
+@lru_cache(maxsize=1)
+def _pdf_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Return the shared PDF rendering process pool, creating it on first call.
+    
+    Returns None when PDF_RENDER_PROCESSES is 0, the platform cannot run
+    process pools or the pool has broken, in which case PDFs render in a
+    worker thread.
+    """
+    if settings.PDF_RENDER_PROCESSES <= 0 or _pdf_pool_broken:
+        return None
+    try:
+        return ProcessPoolExecutor(max_workers=settings.PDF_RENDER_PROCESSES, initializer=_warm_renderer)
+    except (OSError, NotImplementedError) as e:
+        print_step("PDF Render Pool", f"Process pool unavailable, rendering in threads: {e}", "error")
+        return None
+
+async def _render_pdf_offloaded(html_content: str) -> bytes:
+    """
+    Render a PDF without blocking the event loop.
+    
+    Args:
+        html_content: Rendered template HTML
+        
+    Returns:
+        PDF bytes
+    """
+    global _pdf_pool_broken
+    pool = _pdf_pool()
+    if pool is not None:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, _render_pdf, html_content)
+        except BrokenProcessPool as e:
+            # Whatever broke this pool (a worker dying, a bad environment)
+            # would likely break a new one too; stay on threads from now on
+            _pdf_pool_broken = True
+            print_step("PDF Render Pool", f"Process pool broken, rendering in threads from now on: {e}", "error")
+            pool.shutdown(wait=False)
+            _pdf_pool.cache_clear()
+    return await asyncio.to_thread(_render_pdf, html_content)
+
+# Rendered PDFs keyed by a BLAKE2b digest of their HTML, most recently used last
+_pdf_cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+
+async def _render_pdf_cached(html_content: str) -> bytes:
+    """
+    Render a PDF, reusing the bytes of an earlier render of identical HTML.
+    
+    Rendering is deterministic for a given HTML string, so re-downloads and
+    retries of the same CV skip WeasyPrint entirely.
+    
+    Args:
+        html_content: Rendered template HTML
+        
+    Returns:
+        PDF bytes
+    """
+    if settings.PDF_CACHE_MAX_ENTRIES <= 0:
+        return await _render_pdf_offloaded(html_content)
+    
+    key = hashlib.blake2b(html_content.encode("utf-8"), digest_size=16).digest()
+    pdf_bytes = _pdf_cache.get(key)
+    if pdf_bytes is not None:
+        _pdf_cache.move_to_end(key)
+        print_step("PDF Cache", "Reusing previously rendered PDF", "info")
+        return pdf_bytes
+    
+    pdf_bytes = await _render_pdf_offloaded(html_content)
+    _pdf_cache[key] = pdf_bytes
+    while len(_pdf_cache) > settings.PDF_CACHE_MAX_ENTRIES:
+        _pdf_cache.popitem(last=False)
+    return pdf_bytes
+
+def _bytecode_cache(enabled: bool, cache_dir: str) -> Optional[jinja2.BytecodeCache]:
+    """
+    Return an on-disk template bytecode cache, or None if it is disabled or unsafe.
+    
+    Bytecode is keyed by template source checksum, so only the first
+    process to load a template after a deploy compiles it. Jinja loads the
+    cached files as code, so the directory must be private to this user.
+    """
+    if not enabled:
+        return None
+    try:
+        if not cache_dir:
+            # Jinja creates a per-user directory and verifies its owner and mode
+            return jinja2.FileSystemBytecodeCache()
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        stat = os.stat(cache_dir)
+    except (OSError, RuntimeError) as e:
+        print_step("Jinja2 Bytecode Cache", f"Cache directory unavailable, compiling in memory: {e}", "error")
+        return None
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o022:
+        print_step("Jinja2 Bytecode Cache",
+                  f"Cache directory {cache_dir} is not private to this user, compiling in memory", "error")
+        return None
+    return jinja2.FileSystemBytecodeCache(cache_dir)
+
 class PDFService:
     """Service for PDF generation operations."""
     
     def __init__(self):
         """Initialize the PDF service."""
         self.template_env = None
+        self.templates: Dict[str, jinja2.Template] = {}
         self._initialize_templates()
     
     def _initialize_templates(self) -> None:
@@ -22,7 +181,13 @@ class PDFService:
         print_step("Jinja2 Template Setup", "Initializing template environment", "input")
         
         template_loader = jinja2.FileSystemLoader(searchpath=settings.TEMPLATES_DIR)
-        self.template_env = jinja2.Environment(loader=template_loader)
+        # Templates only change on deploy: never re-stat source files, never evict.
+        # Trimming the block tags' lines leaves WeasyPrint less whitespace to parse
+        self.template_env = jinja2.Environment(
+            loader=template_loader, auto_reload=False, cache_size=-1,
+            trim_blocks=True, lstrip_blocks=True,
+            bytecode_cache=_bytecode_cache(settings.JINJA_BYTECODE_CACHE, settings.JINJA_BYTECODE_CACHE_DIR)
+        )
         
         # Add custom filters
         def month_name_filter(month_num):
@@ -38,7 +203,35 @@ class PDFService:
         
         self.template_env.filters['month_name'] = month_name_filter
         
-        print_step("Jinja2 Template Setup", "Template environment initialized with custom filters", "output")
+        # Compile every template up front so requests do no filesystem work
+        self.templates = {
+            name: self.template_env.get_template(f"{name}.html")
+            for name in self.get_available_templates()
+        }
+        
+        print_step("Jinja2 Template Setup", lambda: {"compiled_templates": list(self.templates)}, "output")
+    
+    def _get_template(self, template_id: str) -> jinja2.Template:
+        """
+        Return the compiled template for an ID.
+        
+        Args:
+            template_id: Template name without the .html extension
+            
+        Returns:
+            Compiled Jinja2 template
+            
+        Raises:
+            ValueError: If no such template exists
+        """
+        template = self.templates.get(template_id)
+        if template is None:
+            # Pick up templates added to the directory after startup
+            if template_id not in self.get_available_templates():
+                raise ValueError(f"Template '{template_id}' not found")
+            template = self.template_env.get_template(f"{template_id}.html")
+            self.templates[template_id] = template
+        return template
     
     async def generate_pdf(self, request: PDFRequest) -> Response:
         """
@@ -50,7 +243,7 @@ class PDFService:
         Returns:
             PDF response
         """
-        print_step("PDF Generation Request", {
+        print_step("PDF Generation Request", lambda: {
             "template_id": request.templateId,
             "personal_name": request.data.personal.name,
             "experience_count": len(request.data.experience),
@@ -58,39 +251,36 @@ class PDFService:
         }, "input")
         
         try:
-            # Check if template exists
-            template_file = f"{request.templateId}.html"
-            template_path = os.path.join(settings.TEMPLATES_DIR, template_file)
+            template = self._get_template(request.templateId)
             
-            if not os.path.exists(template_path):
-                print_step("PDF Generation Error", f"Template not found: {template_file}", "error")
-                raise ValueError(f"Template '{request.templateId}' not found")
+            # Render from the models themselves: Jinja resolves job.role with
+            # getattr first, so dicts fail over through an AttributeError on
+            # every lookup, and dumping would copy the whole tree besides
+            template_data = dict(request.data)
+            print_step("HTML Rendering", lambda: {"data_keys": list(template_data.keys())}, "input")
             
-            print_step("Template Loading", {"template_file": template_file}, "input")
-            template = self.template_env.get_template(template_file)
-            print_step("Template Loading", "Template loaded successfully", "output")
-            
-            # Render the HTML with the user's data
-            print_step("HTML Rendering", {
-                "data_keys": list(request.data.model_dump().keys())
-            }, "input")
-            
-            html_content = template.render(request.data.model_dump())
-            print_step("HTML Rendering", {"html_length": len(html_content)}, "output")
+            html_content = template.render(template_data)
+            print_step("HTML Rendering", lambda: {"html_length": len(html_content)}, "output")
             
             # Generate PDF from the rendered HTML
-            print_step("PDF Generation", {"html_length": len(html_content)}, "input")
-            pdf_bytes = HTML(string=html_content).write_pdf()
-            print_step("PDF Generation", {"pdf_size_bytes": len(pdf_bytes)}, "output")
+            print_step("PDF Generation", lambda: {"html_length": len(html_content)}, "input")
+            pdf_bytes = await _render_pdf_cached(html_content)
+            print_step("PDF Generation", lambda: {"pdf_size_bytes": len(pdf_bytes)}, "output")
             
             # Set headers for file download
+            # Slashes are swapped first, or sanitizing would keep only the last segment
+            safe_name = request.data.personal.name.replace(' ', '_').replace('/', '_')
+            filename = sanitize_filename(f"cv_{safe_name}.pdf")
+            # Header values must be latin-1: send an ASCII fallback plus the
+            # RFC 5987 UTF-8 form so non-Latin names still name the download
+            ascii_filename = filename.encode("ascii", "replace").decode("ascii").replace("?", "_")
             headers = {
-                'Content-Disposition': f'attachment; filename="cv_{request.data.personal.name.replace(" ", "_")}.pdf"'
+                'Content-Disposition': f"attachment; filename=\"{ascii_filename}\"; filename*=UTF-8''{quote(filename)}"
             }
             
-            print_step("PDF Generation Complete", {
+            print_step("PDF Generation Complete", lambda: {
                 "pdf_size_kb": round(len(pdf_bytes) / 1024, 2),
-                "filename": f"cv_{request.data.personal.name.replace(' ', '_')}.pdf"
+                "filename": filename
             }, "output")
             
             return Response(pdf_bytes, headers=headers, media_type='application/pdf')
@@ -106,13 +296,9 @@ class PDFService:
         Returns:
             List of template names
         """
-        if not os.path.exists(settings.TEMPLATES_DIR):
+        try:
+            mtime_ns = os.stat(settings.TEMPLATES_DIR).st_mtime_ns
+        except FileNotFoundError:
             return []
         
-        templates = []
-        for file in os.listdir(settings.TEMPLATES_DIR):
-            if file.endswith('.html'):
-                template_name = file[:-5]  # Remove .html extension
-                templates.append(template_name)
-        
-        return templates
+        return list(_list_templates(settings.TEMPLATES_DIR, mtime_ns))
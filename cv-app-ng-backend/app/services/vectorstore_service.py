@@ -1,15 +1,62 @@
 """
-Vectorstore service for document storage and retrieval.
+Vectorstore service for document chunking, embedding and retrieval.
+
+Retrieval runs over per-request in-memory indexes; there is no shared
+persistent store.
 """
-from typing import List, Optional
-from langchain_pinecone import PineconeVectorStore
-from langchain_chroma import Chroma
+from typing import Callable, List, Optional, Sequence
+import numpy as np
 from langchain_openai import OpenAIEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
-from pinecone import Pinecone as PineconeClient, ServerlessSpec
 from ..core.config import settings
 from ..utils.debug import print_step
+from .embedding_cache import CachedEmbeddings, EmbeddingCache
+
+class EphemeralIndex:
+    """
+    In-memory similarity index over one request's documents.
+    
+    Built per request and discarded afterwards, so concurrent requests never
+    share (or clear) each other's documents.
+    """
+    
+    def __init__(self, documents: List[Document], vectors: np.ndarray, embed_query: Callable[[str], List[float]]):
+        """
+        Initialize the index.
+        
+        Args:
+            documents: Indexed documents
+            vectors: L2-normalized document embeddings, one row per document
+            embed_query: Function embedding a query string
+        """
+        self.documents = documents
+        self.vectors = vectors
+        self._embed_query = embed_query
+    
+    def retrieve(self, query: str, k: int) -> List[Document]:
+        """
+        Retrieve the k documents most similar to the query.
+        
+        Args:
+            query: Search query
+            k: Number of documents to retrieve
+            
+        Returns:
+            Documents ordered by descending cosine similarity
+        """
+        query_vector = np.asarray(self._embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        if norm:
+            query_vector = query_vector / norm
+        
+        scores = self.vectors @ query_vector
+        if k < len(scores):
+            top = np.argpartition(-scores, k)[:k]
+            order = top[np.argsort(-scores[top])]
+        else:
+            order = np.argsort(-scores)
+        return [self.documents[i] for i in order]
 
 class VectorstoreService:
     """Service for vectorstore operations."""
@@ -17,12 +64,14 @@ class VectorstoreService:
     def __init__(self):
         """Initialize the vectorstore service."""
         self.embeddings: Optional[OpenAIEmbeddings] = None
-        self.vectorstore: Optional[PineconeVectorStore] = None
+        self.embedding_cache: Optional[EmbeddingCache] = None
+        # LangChain-compatible view of the embeddings through the cache
+        self.cached_embeddings: Optional[CachedEmbeddings] = None
         self.text_splitter: RecursiveCharacterTextSplitter = None
         self._initialize_components()
     
     def _initialize_components(self) -> None:
-        """Initialize embeddings, text splitter, and vectorstore."""
+        """Initialize embeddings and text splitter."""
         # Initialize embeddings
         print_step("Embeddings Initialization", {
             "api_key_present": bool(settings.OPENAI_API_KEY)
@@ -30,6 +79,12 @@ class VectorstoreService:
         
         if settings.OPENAI_API_KEY:
             self.embeddings = OpenAIEmbeddings(model="text-embedding-ada-002")
+            self.embedding_cache = EmbeddingCache(
+                self.embeddings.model,
+                settings.EMBEDDING_CACHE_MAX_ENTRIES,
+                settings.EMBEDDING_CACHE_DTYPE
+            )
+            self.cached_embeddings = CachedEmbeddings(self.embeddings, self.embedding_cache)
             print_step("Embeddings Initialization", 
                       "OpenAI embeddings initialized successfully", "output")
         else:
@@ -42,72 +97,16 @@ class VectorstoreService:
             "chunk_overlap": settings.CHUNK_OVERLAP
         }, "input")
         
+        # Separators are merged back in when chunks are joined, so dropping
+        # them from the splits skips the lookbehind regex keep_separator uses
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=settings.CHUNK_SIZE,
-            chunk_overlap=settings.CHUNK_OVERLAP
+            chunk_overlap=settings.CHUNK_OVERLAP,
+            separators=["\n\n", "\n", " ", ""],
+            keep_separator=False,
+            length_function=len
         )
         print_step("Text Splitter Setup", "Text splitter initialized", "output")
-        
-        # Initialize vectorstore
-        self._initialize_vectorstore()
-    
-    def _initialize_vectorstore(self) -> None:
-        """Initialize the vectorstore."""
-        print_step("Vectorstore Initialization", {
-            "embeddings_available": self.embeddings is not None,
-            "mock_pinecone": settings.MOCK_PINECONE
-        }, "input")
-        
-        if not self.embeddings:
-            print_step("Vectorstore Initialization", 
-                      "Vectorstore not initialized - OpenAI API key required", "error")
-            return
-        
-        if settings.MOCK_PINECONE:
-            print_step("Vectorstore Initialization", 
-                      "Using mocked Pinecone (ChromaDB in-memory)", "info")
-            self.vectorstore = Chroma(
-                embedding_function=self.embeddings,
-                collection_name=settings.PINECONE_INDEX_NAME
-            )
-            print_step("Vectorstore Initialization", 
-                      "ChromaDB vectorstore created", "output")
-        else:
-            self._initialize_pinecone()
-    
-    def _initialize_pinecone(self) -> None:
-        """Initialize Pinecone vectorstore."""
-        print_step("Vectorstore Initialization", 
-                  "Connecting to production Pinecone", "info")
-        
-        pinecone_client = PineconeClient(api_key=settings.PINECONE_API_KEY)
-        existing_indexes = pinecone_client.list_indexes().names()
-        print_step("Pinecone Index Check", {
-            "existing_indexes": existing_indexes
-        }, "info")
-        
-        if settings.PINECONE_INDEX_NAME not in existing_indexes:
-            print_step("Pinecone Index Creation", {
-                "index_name": settings.PINECONE_INDEX_NAME,
-                "dimension": 1536
-            }, "input")
-            
-            pinecone_client.create_index(
-                name=settings.PINECONE_INDEX_NAME,
-                dimension=1536,
-                metric='cosine',
-                spec=ServerlessSpec(cloud='aws', region='us-east-1')
-            )
-            print_step("Pinecone Index Creation", 
-                      f"Index '{settings.PINECONE_INDEX_NAME}' created successfully", "output")
-        
-        # Use the new langchain-pinecone package
-        self.vectorstore = PineconeVectorStore.from_existing_index(
-            index_name=settings.PINECONE_INDEX_NAME,
-            embedding=self.embeddings
-        )
-        print_step("Vectorstore Initialization", 
-                  "Pinecone vectorstore connected", "output")
     
     def create_documents(self, text: str) -> List[Document]:
         """
@@ -119,86 +118,87 @@ class VectorstoreService:
         Returns:
             List of documents
         """
-        print_step("Document Creation", {
+        print_step("Document Creation", lambda: {
             "text_length": len(text)
         }, "input")
         
         docs = self.text_splitter.create_documents([text])
-        print_step("Document Creation", {
+        print_step("Document Creation", lambda: {
             "document_count": len(docs),
             "total_chunks": sum(len(doc.page_content) for doc in docs)
         }, "output")
         
         return docs
     
-    def add_documents(self, documents: List[Document]) -> None:
+    def build_ephemeral(self, documents: List[Document], prefetch_queries: Sequence[str] = ()) -> EphemeralIndex:
         """
-        Add documents to vectorstore.
+        Embed documents into a per-request in-memory index.
         
         Args:
-            documents: Documents to add
-        """
-        if not self.vectorstore:
-            raise ValueError("Vectorstore not initialized")
+            documents: Documents to index
+            prefetch_queries: Queries to embed in the same API call, so the
+                index's later query lookups hit the embedding cache
             
-        print_step("Document Indexing", {
+        Returns:
+            Ephemeral index over the documents
+        """
+        if not self.embeddings:
+            raise ValueError("Embeddings not initialized")
+        
+        print_step("Ephemeral Indexing", lambda: {
             "document_count": len(documents)
         }, "input")
         
-        self.vectorstore.add_documents(documents)
-        print_step("Document Indexing", "Documents added to vectorstore", "output")
+        # One batched request for all chunks plus the queries (OpenAI's
+        # embed_query is embed_documents on a single text, so keys are shared)
+        texts = [doc.page_content for doc in documents]
+        vectors = self.embedding_cache.embed_many(
+            texts + list(prefetch_queries), self.embeddings.embed_documents
+        )[:len(texts)]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors /= norms
+        
+        print_step("Ephemeral Indexing", lambda: {"vector_shape": vectors.shape}, "output")
+        return EphemeralIndex(documents, vectors, self.embed_query)
     
-    def retrieve_documents(self, query: str, k: int = None) -> List[Document]:
+    def embed_query(self, text: str) -> np.ndarray:
         """
-        Retrieve documents from vectorstore.
+        Embed a query string, reusing cached embeddings of identical text.
         
         Args:
+            text: Query text
+            
+        Returns:
+            Query embedding as float32
+        """
+        if not self.embeddings:
+            raise ValueError("Embeddings not initialized")
+        return self.embedding_cache.embed_one(text, self.embeddings.embed_query)
+    
+    def get_relevant_documents(self, text: str, query: str, k: int = None) -> List[Document]:
+        """
+        Split text into documents and return the chunks most relevant to the query.
+        
+        Chunks are ranked with a per-request in-memory index, so concurrent
+        requests never see each other's documents. When the text splits into no more than k
+        chunks, retrieval would return every chunk anyway, so embedding is
+        skipped entirely.
+        
+        Args:
+            text: Text to split and search
             query: Search query
             k: Number of documents to retrieve
             
         Returns:
-            Retrieved documents
+            Relevant documents
         """
-        if not self.vectorstore:
-            raise ValueError("Vectorstore not initialized")
-            
         k = k or settings.RETRIEVAL_K
+        docs = self.create_documents(text)
         
-        print_step("Document Retrieval", {
-            "query": query,
-            "k": k
-        }, "input")
-        
-        retriever = self.vectorstore.as_retriever(search_kwargs={'k': k})
-        retrieved_docs = retriever.invoke(query)
+        if len(docs) <= k:
+            print_step("Document Retrieval", 
+                      f"{len(docs)} chunk(s) fit within k={k}, skipping embedding", "info")
+            return docs
         
-        print_step("Document Retrieval", {
-            "retrieved_docs_count": len(retrieved_docs),
-            "retrieved_context_length": sum(len(doc.page_content) for doc in retrieved_docs),
-            "retrieved_context_preview": retrieved_docs[0].page_content[:200] + "..." if retrieved_docs else ""
-        }, "output")
-        
-        return retrieved_docs
-    
-    def clear_vectorstore(self) -> None:
-        """Clear all documents from vectorstore."""
-        if not self.vectorstore:
-            return
-            
-        print_step("Vectorstore Cleanup", {
-            "mock_pinecone": settings.MOCK_PINECONE
-        }, "input")
-        
-        if settings.MOCK_PINECONE and hasattr(self.vectorstore, '_collection'):
-            collection_ids = self.vectorstore.get()['ids']
-            if collection_ids:
-                self.vectorstore._collection.delete(ids=collection_ids)
-                print_step("Vectorstore Cleanup", {
-                    "deleted_ids_count": len(collection_ids)
-                }, "output")
-            else:
-                print_step("Vectorstore Cleanup", 
-                          "No existing documents to delete", "output")
-        else:
-            print_step("Vectorstore Cleanup", 
-                      "Vectorstore cleanup not supported for production Pinecone", "info")
+        return self.build_ephemeral(docs, prefetch_queries=(query,)).retrieve(query, k)
@@ -1,39 +1,88 @@
 """
 Debug utilities for logging and debugging.
 """
-import json
+import atexit
+import queue
+import sys
+import threading
 from typing import Any, Optional
+import orjson
 from ..core.config import settings
 
+# Formatted records waiting to be written; full queue drops records and
+# None tells the writer thread to stop
+_LOG_QUEUE: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=10_000)
+_DATA_HEADERS = {
+    "input": "📥 INPUT DATA:",
+    "output": "📤 OUTPUT DATA:",
+    "error": "❌ ERROR:",
+}
+_RULE = "=" * 60
+
+def _format_step(step_name: str, data: Optional[Any], data_type: str) -> str:
+    """Render a debug record in the print_step layout."""
+    lines = ["", _RULE, f"🔍 STEP: {step_name}", _RULE]
+
+    if data is not None:
+        lines.append(_DATA_HEADERS.get(data_type, "ℹ️  DATA:"))
+        if isinstance(data, (dict, list)):
+            lines.append(orjson.dumps(
+                data, default=str,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            ).decode())
+        else:
+            lines.append(str(data))
+
+    lines.append(_RULE)
+    return "\n".join(lines) + "\n\n"
+
+def _drain_logs() -> None:
+    """Write queued records to stdout until the stop sentinel arrives."""
+    while True:
+        record = _LOG_QUEUE.get()
+        if record is None:
+            return
+        sys.stdout.write(record)
+        sys.stdout.flush()
+
+def _flush_logs(writer: threading.Thread) -> None:
+    """Let the writer thread finish the queued records (runs at exit)."""
+    try:
+        _LOG_QUEUE.put(None, timeout=1.0)
+    except queue.Full:
+        return
+    writer.join(timeout=1.0)
+
 def print_step(step_name: str, data: Optional[Any] = None, data_type: str = "info") -> None:
     """
     Helper function to print formatted debug information.
-    
+
+    The record is formatted on the calling thread (a snapshot of the data)
+    and written to stdout by a background thread, so request handlers
+    never block on console I/O.
+
     Args:
         step_name: Name of the step being logged
-        data: Data to log (optional)
+        data: Data to log (optional). May be a zero-argument callable, which
+            is only evaluated when debug output is enabled.
         data_type: Type of data (input, output, error, info)
     """
-    if not settings.DEBUG:
-        return
-        
-    print(f"\n{'='*60}")
-    print(f"🔍 STEP: {step_name}")
-    print(f"{'='*60}")
-    
-    if data is not None:
-        if data_type == "input":
-            print(f"📥 INPUT DATA:")
-        elif data_type == "output":
-            print(f"📤 OUTPUT DATA:")
-        elif data_type == "error":
-            print(f"❌ ERROR:")
-        else:
-            print(f"ℹ️  DATA:")
-        
-        if isinstance(data, (dict, list)):
-            print(json.dumps(data, indent=2, default=str))
-        else:
-            print(str(data))
-    
-    print(f"{'='*60}\n")
+    if callable(data):
+        data = data()
+
+    try:
+        _LOG_QUEUE.put_nowait(_format_step(step_name, data, data_type))
+    except queue.Full:
+        pass  # Debug output is best-effort
+
+def _print_step_disabled(step_name: str, data: Optional[Any] = None, data_type: str = "info") -> None:
+    """No-op replacement for print_step when DEBUG is off."""
+    return None
+
+# Bind once at import so production calls cost a single no-op function call
+if settings.DEBUG:
+    _writer = threading.Thread(target=_drain_logs, name="debug-log-writer", daemon=True)
+    _writer.start()
+    atexit.register(_flush_logs, _writer)
+else:
+    print_step = _print_step_disabled
@@ -1,8 +1,8 @@
 """
 File processing utilities for document extraction.
 """
-import fitz
-import docx
+import io
+from typing import BinaryIO, Union
 from ..utils.debug import print_step
 
 def extract_text_from_pdf(file_stream: bytes) -> str:
@@ -10,35 +10,46 @@ def extract_text_from_pdf(file_stream: bytes) -> str:
     Extract text from PDF file stream.
     
     Args:
-        file_stream: PDF file as bytes
+        file_stream: PDF file as bytes (parsed in memory, no temp file)
         
     Returns:
         Extracted text content
     """
-    print_step("PDF Text Extraction", {"file_size": len(file_stream)}, "input")
-    doc = fitz.open(stream=file_stream, filetype="pdf")
-    text = "".join(page.get_text() for page in doc)
-    print_step("PDF Text Extraction", {
+    import fitz  # imported on first use: PyMuPDF is slow to load at cold start
+    print_step("PDF Text Extraction", lambda: {"file_size": len(file_stream)}, "input")
+    # Close the document (and free MuPDF's page cache) as soon as the text is out
+    with fitz.open(stream=file_stream, filetype="pdf") as doc:
+        parts = [page.get_text("text", sort=False) for page in doc]
+        page_count = len(parts)
+    text = "".join(parts)
+    print_step("PDF Text Extraction", lambda: {
         "extracted_text_length": len(text), 
-        "page_count": len(doc)
+        "page_count": page_count
     }, "output")
     return text
 
-def extract_text_from_docx(file_stream: bytes) -> str:
+def extract_text_from_docx(file_stream: Union[bytes, BinaryIO]) -> str:
     """
     Extract text from DOCX file stream.
     
     Args:
-        file_stream: DOCX file as bytes
+        file_stream: DOCX file as bytes or a binary file-like object
         
     Returns:
         Extracted text content
     """
-    print_step("DOCX Text Extraction", {"file_size": len(file_stream)}, "input")
+    import docx  # imported on first use, like fitz above
+    if isinstance(file_stream, (bytes, bytearray)):
+        print_step("DOCX Text Extraction", lambda: {"file_size": len(file_stream)}, "input")
+        # python-docx needs a path or file-like object; wrap the bytes in memory
+        file_stream = io.BytesIO(file_stream)
     doc = docx.Document(file_stream)
-    text = "\n".join([para.text for para in doc.paragraphs])
-    print_step("DOCX Text Extraction", {
+    # doc.paragraphs rebuilds its list from the XML tree on every access.
+    # Empty paragraphs (spacing in exported CVs) only add blank lines
+    texts = [text for para in doc.paragraphs if (text := para.text)]
+    text = "\n".join(texts)
+    print_step("DOCX Text Extraction", lambda: {
         "extracted_text_length": len(text), 
-        "paragraph_count": len(doc.paragraphs)
+        "paragraph_count": len(texts)
     }, "output")
     return text
@@ -1,34 +1,92 @@
 """
 Security utilities for the CV Builder application.
 """
+import hashlib
 import magic
 import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Collection, Optional
 from fastapi import HTTPException
 from ..utils.debug import print_step
 
-def validate_file_content(file_content: bytes, expected_type: str) -> bool:
+# Compiled once at import; the sanitizers run on every request
+_UNSAFE_FILENAME_CHARS_RE = re.compile(r'[^\w\-_\.]')
+_SCRIPT_TAG_RE = re.compile(r'<script[^>]*>.*?</script>', re.IGNORECASE | re.DOTALL)
+_JAVASCRIPT_URL_RE = re.compile(r'javascript:', re.IGNORECASE)
+_EVENT_HANDLER_RE = re.compile(r'on\w+\s*=', re.IGNORECASE)
+# Each unsafe construct with a character every match must contain; a
+# memchr-speed `in` check skips the regex scan when that character is absent
+_UNSAFE_INPUT_PATTERNS = (
+    ('<', _SCRIPT_TAG_RE),
+    (':', _JAVASCRIPT_URL_RE),
+    ('=', _EVENT_HANDLER_RE),
+)
+
+# Bytes handed to libmagic. Type signatures sit at the start of the file; DOCX
+# detection also reads the first few zip entry names, so leave generous room
+_MIME_SNIFF_BYTES = 64 * 1024
+# Detected types of recently seen uploads (retries, double submits), keyed by
+# a digest of the sniffed bytes; hashing them is cheaper than libmagic
+_MIME_CACHE_MAX_ENTRIES = 256
+_mime_cache: "OrderedDict[bytes, str]" = OrderedDict()
+_mime_cache_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
+def _mime_detector() -> magic.Magic:
+    """Return the shared libmagic MIME detector, loading its database on first call."""
+    return magic.Magic(mime=True)
+
+def detect_mime_type(file_content: bytes) -> str:
+    """
+    Detect a file's MIME type from its leading bytes.
+    
+    Args:
+        file_content: File content as bytes
+        
+    Returns:
+        Detected MIME type
+    """
+    head = file_content[:_MIME_SNIFF_BYTES]
+    key = hashlib.blake2b(head, digest_size=16).digest()
+    with _mime_cache_lock:
+        mime_type = _mime_cache.get(key)
+        if mime_type is not None:
+            _mime_cache.move_to_end(key)
+            return mime_type
+    
+    mime_type = _mime_detector().from_buffer(head)
+    with _mime_cache_lock:
+        _mime_cache[key] = mime_type
+        if len(_mime_cache) > _MIME_CACHE_MAX_ENTRIES:
+            _mime_cache.popitem(last=False)
+    return mime_type
+
+def validate_file_content(file_content: bytes, expected_type: str, mime_type: Optional[str] = None) -> bool:
     """
     Validate file content matches expected MIME type.
     
     Args:
         file_content: File content as bytes
         expected_type: Expected MIME type
+        mime_type: Already detected MIME type, to skip detecting it again
         
     Returns:
         True if file content matches expected type
     """
     try:
-        mime_type = magic.from_buffer(file_content, mime=True)
-        print_step("File Content Validation", {
+        if mime_type is None:
+            mime_type = detect_mime_type(file_content)
+        print_step("File Content Validation", lambda: {
             "expected_type": expected_type,
             "detected_type": mime_type,
             "file_size": len(file_content)
         }, "input")
         
         is_valid = mime_type == expected_type
-        print_step("File Content Validation", {
+        print_step("File Content Validation", lambda: {
             "is_valid": is_valid,
             "mime_type": mime_type
         }, "output")
@@ -52,7 +110,7 @@ def sanitize_filename(filename: str) -> str:
     sanitized = Path(filename).name
     
     # Remove any remaining dangerous characters
-    sanitized = re.sub(r'[^\w\-_\.]', '_', sanitized)
+    sanitized = _UNSAFE_FILENAME_CHARS_RE.sub('_', sanitized)
     
     # Limit filename length
     if len(sanitized) > 255:
@@ -75,7 +133,7 @@ def validate_file_size(file_content: bytes, max_size: int) -> bool:
     file_size = len(file_content)
     is_valid = file_size <= max_size
     
-    print_step("File Size Validation", {
+    print_step("File Size Validation", lambda: {
         "file_size": file_size,
         "max_size": max_size,
         "is_valid": is_valid
@@ -83,14 +141,14 @@ def validate_file_size(file_content: bytes, max_size: int) -> bool:
     
     return is_valid
 
-def validate_uploaded_file(file_content: bytes, filename: str, allowed_types: list, max_size: int) -> dict:
+def validate_uploaded_file(file_content: bytes, filename: str, allowed_types: Collection[str], max_size: int) -> dict:
     """
     Comprehensive file validation for uploads.
     
     Args:
         file_content: File content as bytes
         filename: Original filename
-        allowed_types: List of allowed MIME types
+        allowed_types: Allowed MIME types
         max_size: Maximum file size in bytes
         
     Returns:
@@ -99,10 +157,10 @@ def validate_uploaded_file(file_content: bytes, filename: str, allowed_types: li
     Raises:
         HTTPException: If validation fails
     """
-    print_step("File Upload Validation", {
+    print_step("File Upload Validation", lambda: {
         "filename": filename,
         "file_size": len(file_content),
-        "allowed_types": allowed_types
+        "allowed_types": sorted(allowed_types)
     }, "input")
     
     # Validate file size
@@ -113,11 +171,11 @@ def validate_uploaded_file(file_content: bytes, filename: str, allowed_types: li
         )
     
     # Validate file content
-    mime_type = magic.from_buffer(file_content, mime=True)
+    mime_type = detect_mime_type(file_content)
     if mime_type not in allowed_types:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid file type: {mime_type}. Allowed types: {allowed_types}"
+            detail=f"Invalid file type: {mime_type}. Allowed types: {', '.join(sorted(allowed_types))}"
         )
     
     # Sanitize filename
@@ -154,9 +212,16 @@ def sanitize_user_input(text: str, max_length: int = 10000) -> str:
     
     # Remove potentially dangerous characters
     # This is a basic sanitization - consider using a proper HTML sanitizer
-    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.IGNORECASE | re.DOTALL)
-    text = re.sub(r'javascript:', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'on\w+\s*=', '', text, flags=re.IGNORECASE)
+    # Removing one construct can expose another (e.g. "javajavascript:script:"),
+    # so repeat until nothing matches; substitution only deletes, so an
+    # unchanged length means the pass found nothing
+    while True:
+        length = len(text)
+        for trigger, pattern in _UNSAFE_INPUT_PATTERNS:
+            if trigger in text:
+                text = pattern.sub('', text)
+        if len(text) == length:
+            break
     
     return text.strip()
 
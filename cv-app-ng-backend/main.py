@@ -1,4 +1,4 @@
 import uvicorn
 
 if __name__ == "__main__":
-    uvicorn.run("app.app:app", host="0.0.0.0", port=8000, reload=True, loop="asyncio")
+    uvicorn.run("app.app:app", host="0.0.0.0", port=8000, reload=True, loop="uvloop", http="httptools")
@@ -61,8 +61,21 @@ cp ../lambda_handler.py .
 # Install dependencies
 pip install -r ../lambda_requirements.txt -t .
 
+# Precompile bytecode so cold starts don't compile modules on the
+# read-only /var/task filesystem. The .pyc files are only used by the same
+# Python version as the runtime (3.11), so prefer that interpreter
+PYTHON_BIN=$(command -v python3.11 || command -v python3)
+if [ -z "$PYTHON_BIN" ]; then
+  echo "⚠️  No python3 found; skipping bytecode precompilation"
+else
+  if ! "$PYTHON_BIN" -c 'import sys; sys.exit(sys.version_info[:2] != (3, 11))'; then
+    echo "⚠️  $PYTHON_BIN is not Python 3.11; Lambda will ignore its precompiled bytecode"
+  fi
+  "$PYTHON_BIN" -m compileall -q -j 0 --invalidation-mode unchecked-hash .
+fi
+
 # Create deployment package
-zip -r ../lambda-deployment.zip . -x "*.pyc" "__pycache__/*" "*.git*" "tests/*" "*.md"
+zip -r ../lambda-deployment.zip . -x "*.git*" "tests/*" "*.md"
 
 cd ..
 echo "✅ Lambda package created: lambda-deployment.zip"
@@ -82,14 +82,13 @@ echo -e "${GREEN}✅ Dependencies ready${NC}"
 echo ""
 echo -e "${YELLOW}💡 Note: For full functionality, create a .env file in cv-app-ng-backend/ with:${NC}"
 echo -e "${YELLOW}   OPENAI_API_KEY=your_openai_api_key_here${NC}"
-echo -e "${YELLOW}   (Optional: PINECONE_API_KEY, MOCK_PINECONE=true)${NC}"
 echo ""
 
 # Start backend server
 echo -e "${BLUE}🔧 Starting backend server (FastAPI)...${NC}"
 cd cv-app-ng-backend
 source venv/bin/activate
-uvicorn main:app --reload --host 0.0.0.0 --port 8000 --loop asyncio &
+uvicorn main:app --reload --host 0.0.0.0 --port 8000 --loop uvloop --http httptools &
 BACKEND_PID=$!
 cd ..
 